@@ -1,5 +1,5 @@
 """AI package - LLM and RAG capabilities."""
-from ai.llm_client import HuggingFaceLLMClient, get_llm_client, load_prompt
+from ai.llm_client import HuggingFaceLLMClient, get_llm_client, close_llm_client, load_prompt, load_prompt_parts
 from ai.rag_service import RAGService, get_rag_service
 from ai.cost_tracker import calculate_cost, format_cost_display
 from ai.analyzer import analyze_content
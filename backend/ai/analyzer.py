@@ -9,15 +9,107 @@ Performs:
 
 All outputs are clearly labeled as AI-generated.
 """
-import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import re
+from typing import Dict, Any, Optional, List, Callable, Tuple
 
-from ai.llm_client import HuggingFaceLLMClient, load_prompt
+import orjson
+
+try:
+    # Optional: JIT-compiles the numeric scoring helper when installed
+    from numba import njit
+except ImportError:
+    njit = None
+
+from ai.llm_client import HuggingFaceLLMClient, load_prompt_parts
 from ai.cost_tracker import calculate_cost
 from ai.rag_service import RAGService
+from config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Outermost JSON array in a model response (first '[' to last ']')
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.S)
+
+# Content limits for sub-prompts (characters)
+PROMPT_CONTENT_CHARS = 3000
+RISK_CONTENT_CHARS = 2000
+
+# Risk levels in precedence order (most severe first)
+RISK_LEVELS = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+# Risk classification only needs a single-word label
+RISK_MAX_TOKENS = 8
+RISK_STOP_SEQUENCES = ["\n", ".", ","]
+
+# Unambiguous phrases that settle the risk level without an LLM call.
+# Checked in order; the first level with a match wins. Priority wording
+# ("high-priority") describes urgency, not risk, so it is not listed.
+RISK_KEYWORDS: Dict[str, List[str]] = {
+    "critical": [
+        r"critical (?:risk|threat|severity)",
+        r"catastrophic",
+        r"loss of life",
+        r"mass casualt(?:y|ies)",
+        r"imminent (?:threat|attack|danger)",
+    ],
+    "high": [
+        r"high[- ](?:risk|severity)",
+        r"severe (?:risk|threat)",
+        r"active (?:breach|compromise|intrusion)",
+    ],
+    "low": [
+        r"low[- ](?:risk|severity)",
+        r"no significant (?:risk|threat|issues)",
+    ],
+}
+
+
+def _compile_risk_keywords(keywords: Dict[str, List[str]]) -> List[tuple]:
+    """Compile each level's phrases into one case-insensitive alternation."""
+    return [
+        (level, re.compile(r"\b(?:" + "|".join(phrases) + r")\b", re.I))
+        for level, phrases in keywords.items()
+    ]
+
+
+_RISK_KEYWORD_PATTERNS = _compile_risk_keywords(RISK_KEYWORDS)
+
+# A negator up to two words before a phrase ("not a critical threat",
+# "no high-risk indicators") cancels it
+_RISK_NEGATION = re.compile(r"\b(?:no|not|never|without|\w+n't)\W+(?:\w+\W+){0,2}$", re.I)
+RISK_NEGATION_WINDOW = 40
+
+
+def _resolve_prompt(prompt_name: str, fallback: str) -> Tuple[Optional[str], Callable[..., str]]:
+    """
+    Resolve a prompt once at import: (system prefix, bound format function).
+    
+    Static instructions go in the system message, inputs in the user message.
+    Falls back to a minimal inline template if the prompt file is missing.
+    """
+    system_prompt, template = load_prompt_parts(prompt_name)
+    return system_prompt or None, (template or fallback).format
+
+
+_SUMMARY_SYSTEM, _format_summary_prompt = _resolve_prompt(
+    "summarize",
+    "Summarize the following content in 3-5 sentences:\n\n{content}"
+)
+_ENTITY_SYSTEM, _format_entity_prompt = _resolve_prompt(
+    "extract_entities",
+    "Extract key entities from this text as a JSON array:\n\n{content}"
+)
+_RISK_SYSTEM, _format_risk_prompt = _resolve_prompt(
+    "classify_risk",
+    "Classify the risk level (LOW, MEDIUM, HIGH, CRITICAL):\n\n{content}"
+)
+_EXPLAIN_SYSTEM, _format_explain_prompt = _resolve_prompt(
+    "explain",
+    "Explain the analysis in plain language:\n\nSummary: {summary}\nRisk: {risk_level}"
+)
 
 
 async def analyze_content(
@@ -34,7 +126,9 @@ async def analyze_content(
         rag_service: RAG service for context retrieval
         
     Returns:
-        Dict containing all analysis results with cost transparency
+        Dict containing all analysis results with cost transparency;
+        "errors" lists any sub-task whose generation failed (its output
+        is a fallback)
     """
     if llm_client is None:
         from ai.llm_client import get_llm_client
@@ -52,28 +146,39 @@ async def analyze_content(
         except Exception as e:
             logger.warning(f"RAG context retrieval failed: {e}")
     
-    # 1. Summarization
-    summary = await _generate_summary(content, context, llm_client)
-    total_input_tokens += summary.get("input_tokens", 0)
-    total_output_tokens += summary.get("output_tokens", 0)
+    # Truncate once and share the slices across all sub-prompts
+    prompt_content = content[:PROMPT_CONTENT_CHARS]
+    risk_content = prompt_content[:RISK_CONTENT_CHARS]
     
-    # 2. Entity extraction
-    entities = await _extract_entities(content, llm_client)
-    total_input_tokens += entities.get("input_tokens", 0)
-    total_output_tokens += entities.get("output_tokens", 0)
+    # 1 + 2. Summarization and entity extraction are independent - run concurrently
+    summary, entities = await asyncio.gather(
+        _generate_summary(prompt_content, context, llm_client),
+        _extract_entities(prompt_content, llm_client),
+        return_exceptions=True
+    )
+    summary = _resolve_task(summary, "summary", {"summary": ""})
+    entities = _resolve_task(entities, "entity extraction", {"entities": []})
+    total_input_tokens += summary.get("input_tokens", 0) + entities.get("input_tokens", 0)
+    total_output_tokens += summary.get("output_tokens", 0) + entities.get("output_tokens", 0)
     
-    # 3. Risk classification
-    risk = await _classify_risk(content, entities.get("entities", []), llm_client)
+    # 3. Risk classification (depends on entities)
+    try:
+        risk = await _classify_risk(risk_content, entities.get("entities", []), llm_client)
+    except Exception as e:
+        risk = _resolve_task(e, "risk classification", {"risk_level": "medium"})
     total_input_tokens += risk.get("input_tokens", 0)
     total_output_tokens += risk.get("output_tokens", 0)
     
-    # 4. Generate explanation
-    explanation = await _generate_explanation(
-        summary.get("summary", ""),
-        risk.get("risk_level", "medium"),
-        entities.get("entities", []),
-        llm_client
-    )
+    # 4. Generate explanation (depends on summary + risk)
+    try:
+        explanation = await _generate_explanation(
+            summary.get("summary", ""),
+            risk.get("risk_level", "medium"),
+            entities.get("entities", []),
+            llm_client
+        )
+    except Exception as e:
+        explanation = _resolve_task(e, "explanation", {"explanation": ""})
     total_input_tokens += explanation.get("input_tokens", 0)
     total_output_tokens += explanation.get("output_tokens", 0)
     
@@ -91,6 +196,10 @@ async def analyze_content(
         content
     )
     
+    errors = [
+        part["error"] for part in (summary, entities, risk, explanation) if part.get("error")
+    ]
+    
     return {
         "summary": f"[AI-Generated] {summary.get('summary', 'Analysis pending')}",
         "entities": entities.get("entities", []),
@@ -101,33 +210,46 @@ async def analyze_content(
         "output_tokens": total_output_tokens,
         "total_tokens": total_input_tokens + total_output_tokens,
         "estimated_cost": cost_data["total_cost"],
-        "confidence_score": confidence
+        "confidence_score": confidence,
+        "errors": errors
     }
 
 
+def _resolve_task(
+    result: Any,
+    task_name: str,
+    fallback: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Normalize a sub-task result, substituting a fallback if it raised."""
+    if isinstance(result, BaseException):
+        logger.warning(f"AI {task_name} failed: {result}")
+        return {**fallback, "input_tokens": 0, "output_tokens": 0, "error": f"{task_name}: {result}"}
+    return result
+
+
 async def _generate_summary(
     content: str,
     context: str,
     llm_client: HuggingFaceLLMClient
 ) -> Dict[str, Any]:
-    """Generate a summary of the content."""
-    prompt_template = load_prompt("summarize")
-    
-    if not prompt_template:
-        # Fallback prompt
-        prompt_template = "Summarize the following content in 3-5 sentences:\n\n{content}"
-    
-    prompt = prompt_template.format(
-        content=content[:3000],  # Limit content length
+    """Generate a summary of the content (already truncated by the caller)."""
+    prompt = _format_summary_prompt(
+        content=content,
         context=context[:1000] if context else "No additional context available."
     )
     
-    result = await llm_client.generate(prompt, max_tokens=300)
+    result = await llm_client.generate(
+        prompt,
+        max_tokens=300,
+        task="summarize",
+        system=_SUMMARY_SYSTEM
+    )
     
     return {
         "summary": result.get("text", "").strip(),
         "input_tokens": result.get("input_tokens", 0),
-        "output_tokens": result.get("output_tokens", 0)
+        "output_tokens": result.get("output_tokens", 0),
+        "error": result.get("error")
     }
 
 
@@ -135,15 +257,15 @@ async def _extract_entities(
     content: str,
     llm_client: HuggingFaceLLMClient
 ) -> Dict[str, Any]:
-    """Extract key entities from content."""
-    prompt_template = load_prompt("extract_entities")
-    
-    if not prompt_template:
-        prompt_template = "Extract key entities from this text as a JSON array:\n\n{content}"
-    
-    prompt = prompt_template.format(content=content[:3000])
-    
-    result = await llm_client.generate(prompt, max_tokens=500)
+    """Extract key entities from content (already truncated by the caller)."""
+    prompt = _format_entity_prompt(content=content)
+    
+    result = await llm_client.generate(
+        prompt,
+        max_tokens=500,
+        task="extract_entities",
+        system=_ENTITY_SYSTEM
+    )
     
     # Parse entities from response
     entities = _parse_entities(result.get("text", ""))
@@ -151,33 +273,30 @@ async def _extract_entities(
     return {
         "entities": entities,
         "input_tokens": result.get("input_tokens", 0),
-        "output_tokens": result.get("output_tokens", 0)
+        "output_tokens": result.get("output_tokens", 0),
+        "error": result.get("error")
     }
 
 
 def _parse_entities(text: str) -> List[Dict[str, Any]]:
     """Parse entity extraction response into structured format."""
-    try:
-        # Try to find JSON array in response
-        start = text.find('[')
-        end = text.rfind(']') + 1
-        
-        if start >= 0 and end > start:
-            json_str = text[start:end]
-            entities = json.loads(json_str)
+    match = _JSON_ARRAY_RE.search(text)
+    if match:
+        try:
+            entities = orjson.loads(match.group(0))
             
             # Validate structure
-            valid_entities = []
-            for entity in entities:
-                if isinstance(entity, dict) and "name" in entity:
-                    valid_entities.append({
-                        "name": entity.get("name", "Unknown"),
-                        "type": entity.get("type", "UNKNOWN"),
-                        "relevance": entity.get("relevance", "medium")
-                    })
-            return valid_entities
-    except (json.JSONDecodeError, Exception) as e:
-        logger.warning(f"Failed to parse entities: {e}")
+            return [
+                {
+                    "name": entity.get("name", "Unknown"),
+                    "type": entity.get("type", "UNKNOWN"),
+                    "relevance": entity.get("relevance", "medium")
+                }
+                for entity in entities
+                if isinstance(entity, dict) and "name" in entity
+            ]
+        except (orjson.JSONDecodeError, Exception) as e:
+            logger.warning(f"Failed to parse entities: {e}")
     
     # Fallback: extract simple entities
     return [{"name": "Analysis pending", "type": "SYSTEM", "relevance": "low"}]
@@ -188,25 +307,33 @@ async def _classify_risk(
     entities: List[Dict[str, Any]],
     llm_client: HuggingFaceLLMClient
 ) -> Dict[str, Any]:
-    """Classify risk/priority level."""
-    prompt_template = load_prompt("classify_risk")
-    
-    if not prompt_template:
-        prompt_template = "Classify the risk level (LOW, MEDIUM, HIGH, CRITICAL):\n\n{content}"
+    """Classify risk/priority level (content already truncated by the caller)."""
+    keyword_level = _match_risk_keywords(content)
+    if keyword_level:
+        return {"risk_level": keyword_level, "input_tokens": 0, "output_tokens": 0}
     
     entities_str = ", ".join([e.get("name", "") for e in entities[:10]])
-    prompt = prompt_template.format(
-        content=content[:2000],
+    prompt = _format_risk_prompt(
+        content=content,
         entities=entities_str or "No entities identified"
     )
     
-    result = await llm_client.generate(prompt, max_tokens=100)
+    # Only a one-word label is needed: cap output, stop at the first
+    # delimiter, and stop streaming as soon as a level appears
+    result = await llm_client.generate(
+        prompt,
+        max_tokens=RISK_MAX_TOKENS,
+        task="classify_risk",
+        stop_when=_contains_risk_level,
+        system=_RISK_SYSTEM,
+        stop=RISK_STOP_SEQUENCES
+    )
     
     # Parse risk level
     risk_text = result.get("text", "").upper()
     risk_level = "medium"  # Default
     
-    for level in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]:
+    for level in RISK_LEVELS:
         if level in risk_text:
             risk_level = level.lower()
             break
@@ -214,10 +341,29 @@ async def _classify_risk(
     return {
         "risk_level": risk_level,
         "input_tokens": result.get("input_tokens", 0),
-        "output_tokens": result.get("output_tokens", 0)
+        "output_tokens": result.get("output_tokens", 0),
+        "error": result.get("error")
     }
 
 
+def _match_risk_keywords(content: str) -> Optional[str]:
+    """Return the risk level implied by unambiguous keywords, if any."""
+    if not settings.risk_keyword_shortcut:
+        return None
+    for level, pattern in _RISK_KEYWORD_PATTERNS:
+        for match in pattern.finditer(content):
+            before = content[max(0, match.start() - RISK_NEGATION_WINDOW):match.start()]
+            if not _RISK_NEGATION.search(before):
+                return level
+    return None
+
+
+def _contains_risk_level(text: str) -> bool:
+    """Return True once streamed text contains a complete risk level."""
+    upper = text.upper()
+    return any(level in upper for level in RISK_LEVELS)
+
+
 async def _generate_explanation(
     summary: str,
     risk_level: str,
@@ -225,27 +371,68 @@ async def _generate_explanation(
     llm_client: HuggingFaceLLMClient
 ) -> Dict[str, Any]:
     """Generate natural language explanation."""
-    prompt_template = load_prompt("explain")
-    
-    if not prompt_template:
-        prompt_template = "Explain the analysis in plain language:\n\nSummary: {summary}\nRisk: {risk_level}"
+    # Low-risk intakes with little to explain get a templated explanation
+    if settings.template_low_risk_explanations and risk_level == "low" and len(entities) <= 1:
+        return {
+            "explanation": _templated_explanation(summary, entities),
+            "input_tokens": 0,
+            "output_tokens": 0
+        }
     
     entities_str = ", ".join([e.get("name", "") for e in entities[:5]])
-    prompt = prompt_template.format(
+    prompt = _format_explain_prompt(
         summary=summary[:500],
         risk_level=risk_level,
         entities=entities_str or "None identified"
     )
     
-    result = await llm_client.generate(prompt, max_tokens=200)
+    result = await llm_client.generate(
+        prompt,
+        max_tokens=200,
+        task="explain",
+        system=_EXPLAIN_SYSTEM
+    )
     
     return {
         "explanation": result.get("text", "").strip(),
         "input_tokens": result.get("input_tokens", 0),
-        "output_tokens": result.get("output_tokens", 0)
+        "output_tokens": result.get("output_tokens", 0),
+        "error": result.get("error")
     }
 
 
+def _templated_explanation(summary: str, entities: List[Dict[str, Any]]) -> str:
+    """Deterministic explanation for routine low-risk intakes."""
+    entity_note = (
+        f"Key entity: {entities[0].get('name', 'Unknown')}."
+        if entities else "No significant entities identified."
+    )
+    summary_note = f" Summary: {summary[:300].rstrip('. ')}." if summary else ""
+    return f"Routine intake assessed as low risk.{summary_note} {entity_note}"
+
+
+def _confidence_score(
+    summary_length: int,
+    entity_count: int,
+    content_length: int
+) -> float:
+    """Uncapped confidence score from scalar length/count features."""
+    return (
+        0.5  # Base score
+        # Summary quality
+        + 0.1 * (summary_length > 50) + 0.05 * (summary_length > 150)
+        # Entity extraction success
+        + 0.1 * (entity_count > 0) + 0.05 * (entity_count > 3)
+        # Content quality
+        + 0.1 * (content_length > 500) + 0.05 * (content_length > 2000)
+    )
+
+
+if njit is not None:
+    # Compiled once and cached on disk so restarts skip the JIT step
+    _confidence_score = njit(cache=True)(_confidence_score)
+
+
 def _calculate_confidence(
     summary: str,
     entities: list,
@@ -260,26 +447,11 @@ def _calculate_confidence(
     - Number of entities extracted
     - Content quality indicators
     """
-    score = 0.5  # Base score
-    
-    # Summary quality
-    if summary and len(summary) > 50:
-        score += 0.1
-    if summary and len(summary) > 150:
-        score += 0.05
-    
-    # Entity extraction success
-    if entities and len(entities) > 0:
-        score += 0.1
-    if entities and len(entities) > 3:
-        score += 0.05
-    
-    # Content quality
-    content_length = len(original_content)
-    if content_length > 500:
-        score += 0.1
-    if content_length > 2000:
-        score += 0.05
+    score = _confidence_score(
+        len(summary or ""),
+        len(entities or []),
+        len(original_content)
+    )
     
     # Cap at 0.95 - never show 100% confidence for AI
-    return min(round(score, 2), 0.95)
+    return min(round(float(score), 2), 0.95)
@@ -1,12 +1,27 @@
 """
 Hugging Face LLM client with cost tracking.
 """
+import asyncio
+import hashlib
 import httpx
+import orjson
 import logging
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional, AsyncIterator, Callable, List, Set, Tuple
 from pathlib import Path
 
 from config import get_settings
+from ai.semantic_cache import SemanticCache
+from ai.metrics import (
+    observe_llm_call,
+    TIER_MEMORY,
+    TIER_DISK,
+    TIER_SEMANTIC,
+    TIER_NETWORK,
+    TIER_ERROR
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -14,9 +29,17 @@ settings = get_settings()
 # Prompts directory
 PROMPTS_DIR = Path(__file__).parent.parent.parent / "prompts"
 
+# Line separating a template's static instructions from its input slots
+PROMPT_SEPARATOR = "\n---\n"
 
+
+@lru_cache(maxsize=32)
 def load_prompt(prompt_name: str) -> str:
-    """Load a prompt template from the prompts directory."""
+    """
+    Load a prompt template from the prompts directory.
+    
+    Templates do not change at runtime, so each is read once per process.
+    """
     prompt_path = PROMPTS_DIR / f"{prompt_name}.txt"
     if prompt_path.exists():
         return prompt_path.read_text()
@@ -24,6 +47,73 @@ def load_prompt(prompt_name: str) -> str:
     return ""
 
 
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """Load the tiktoken encoder once per process; None if unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        logger.warning("tiktoken not installed, using character-based token estimates")
+    except Exception as e:
+        # The BPE file is downloaded on first use and may be unreachable offline
+        logger.warning(f"tiktoken encoder unavailable, using character-based token estimates: {e}")
+    return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens for cost tracking when the API does not report usage.
+    
+    Uses tiktoken's cl100k_base encoding (an approximation for non-OpenAI
+    models), falling back to ~4 characters per token.
+    """
+    encoder = _get_encoder()
+    if encoder is None:
+        return len(text) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=32)
+def load_prompt_parts(prompt_name: str) -> Tuple[str, str]:
+    """
+    Load a prompt template split into (static prefix, dynamic template).
+    
+    Templates separate their fixed instructions from the input slots with a
+    line containing only `---`. The prefix is sent as the system message so
+    it forms a cacheable, byte-identical head on every request; only the
+    dynamic part needs str.format(). Templates without a separator are
+    returned entirely as the dynamic part.
+    """
+    template = load_prompt(prompt_name)
+    prefix, separator, suffix = template.partition(PROMPT_SEPARATOR)
+    if not separator:
+        return "", template
+    return prefix.strip(), suffix.lstrip("\n")
+
+
+class LLMAPIError(Exception):
+    """Non-200 response from the Inference API."""
+    
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        super().__init__(f"HuggingFace API error: {status_code} - {detail}")
+
+
+def _open_disk_cache(directory: str):
+    """Open the persistent LLM response cache, or None if disabled/unavailable."""
+    if not directory:
+        return None
+    try:
+        import diskcache
+        return diskcache.Cache(directory, size_limit=2**30)
+    except ImportError:
+        logger.warning("diskcache not installed, persistent LLM cache disabled")
+    except Exception as e:
+        logger.warning(f"Failed to open LLM disk cache at {directory}: {e}")
+    return None
+
+
 class HuggingFaceLLMClient:
     """
     Hugging Face Inference API client.
@@ -32,130 +122,436 @@ class HuggingFaceLLMClient:
     Tracks token usage for cost transparency (though HF free tier is $0).
     """
     
-    def __init__(self, api_key: str = None, model: str = None):
+    def __init__(self, api_key: str = None, model: str = None, rag_service=None):
         self.api_key = api_key or settings.huggingface_api_key
         self.model = model or settings.huggingface_model
         # Use the new OpenAI-compatible Inference Providers API
         self.base_url = "https://router.huggingface.co/v1/chat/completions"
         self.total_tokens_used = 0
         self.total_requests = 0
+        self._http_client: Optional[httpx.AsyncClient] = None
+        
+        # Exact-match response cache (LRU), keyed by model + params + prompt
+        self.cache_size = settings.llm_cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.cache_hits = 0
+        
+        # Optional semantic cache for near-duplicate prompts (per task type)
+        self.semantic_cache: Optional[SemanticCache] = None
+        if settings.llm_semantic_cache_enabled:
+            self.semantic_cache = SemanticCache(
+                threshold=settings.llm_semantic_cache_threshold,
+                max_entries=self.cache_size,
+                rag_service=rag_service
+            )
+        
+        # Optional persistent tier shared across workers and restarts
+        self._disk = _open_disk_cache(settings.llm_disk_cache_dir)
+        self.disk_cache_ttl = settings.llm_disk_cache_ttl
+        
+        # Micro-batching: completions queued within a short window are
+        # dispatched together on the shared connection
+        self.batch_window_ms = settings.llm_batch_window_ms
+        self.batch_max_size = settings.llm_batch_max_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client, creating it on first use.
+        
+        One long-lived client keeps TLS sessions and keep-alive connections
+        warm across calls; HTTP/2 multiplexes concurrent sub-prompts over a
+        single connection when the h2 package is installed.
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            limits = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            try:
+                self._http_client = httpx.AsyncClient(timeout=60.0, limits=limits, http2=True)
+            except ImportError:
+                logger.warning("h2 not installed, LLM client falling back to HTTP/1.1")
+                self._http_client = httpx.AsyncClient(timeout=60.0, limits=limits)
+        return self._http_client
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        early_stop: bool = False,
+        system: Optional[str] = None,
+        stop: Optional[List[str]] = None
+    ) -> str:
+        """Build the exact-match cache key for a generation request."""
+        raw = f"{self.model}|{max_tokens}|{temperature}|{system or ''}|{prompt}"
+        if stop:
+            raw += "|stop=" + "\x1f".join(stop)
+        if early_stop:
+            # Early-stopped responses are truncated; keep them separate
+            raw += "|early-stop"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _cache_get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Return (copy of cached response, tier) or (None, None) on a miss.
+        
+        Checks the in-memory LRU first, then the disk tier (promoting hits
+        back into memory).
+        """
+        tier = TIER_MEMORY
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+        elif self._disk is not None:
+            tier = TIER_DISK
+            cached = self._disk.get(key)
+            if cached is not None:
+                self._memory_put(key, cached)
+        if cached is None:
+            return None, None
+        self.cache_hits += 1
+        return {**cached, "cache_hit": True}, tier
+    
+    def _memory_put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a response in the in-memory LRU, evicting the oldest entry."""
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def _cache_put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a successful response in every enabled cache tier."""
+        self._memory_put(key, result)
+        if self._disk is not None:
+            try:
+                self._disk.set(key, result, expire=self.disk_cache_ttl)
+            except Exception as e:
+                logger.warning(f"LLM disk cache write failed: {e}")
         
     async def generate(
         self,
         prompt: str,
         max_tokens: int = 500,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        task: Optional[str] = None,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        system: Optional[str] = None,
+        stop: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Generate text using Hugging Face Inference API (OpenAI-compatible).
         
+        `system` is sent as a separate system message ahead of the prompt.
+        Keeping static instructions there gives providers that cache prompt
+        prefixes an identical leading segment on every call.
+        
+        `task` names the prompt type (e.g. "summarize") and enables the
+        semantic cache for that task when it is configured.
+        
+        `stop` is a list of provider-side stop sequences; generation halts
+        when the model emits any of them.
+        
+        `stop_when` switches to a streamed request that is cancelled as soon
+        as the predicate returns True for the text received so far, so callers
+        that only need the first few tokens skip the rest of the generation.
+        
         Returns dict with:
         - text: Generated text
         - input_tokens: Estimated input token count
         - output_tokens: Estimated output token count
         - model: Model used
+        - cache_hit: True if served from the response cache
         """
-        headers = {
+        cache_key = self._cache_key(
+            prompt, max_tokens, temperature,
+            early_stop=stop_when is not None,
+            system=system,
+            stop=stop
+        )
+        start_time = time.perf_counter()
+        
+        cached, tier = self._cache_get(cache_key)
+        if cached is not None:
+            observe_llm_call(tier, time.perf_counter() - start_time)
+            return cached
+        
+        if task and self.semantic_cache is not None:
+            cached = await self.semantic_cache.get(task, prompt)
+            if cached is not None:
+                self.cache_hits += 1
+                observe_llm_call(TIER_SEMANTIC, time.perf_counter() - start_time)
+                return cached
+        
+        full_prompt = f"{system}\n\n{prompt}" if system else prompt
+        failure = None
+        
+        try:
+            if stop_when is None:
+                generated_text, usage = await self._complete(
+                    prompt, max_tokens, temperature, system, stop
+                )
+            else:
+                generated_text, usage = await self._complete_streaming(
+                    prompt, max_tokens, temperature, stop_when, system, stop
+                )
+        except LLMAPIError as e:
+            logger.error(str(e))
+            
+            # Return fallback with error
+            failure = self._failure(full_prompt, f"[AI generation failed: {e.status_code}]", str(e))
+        except httpx.TimeoutException as e:
+            logger.error(f"LLM request timed out: {str(e)}")
+            failure = self._failure(full_prompt, "[AI generation failed: Request timed out]", f"Timeout: {str(e)}")
+        except httpx.RequestError as e:
+            logger.error(f"LLM request failed: {str(e)}")
+            failure = self._failure(full_prompt, "[AI generation failed: Network error]", f"Network error: {str(e)}")
+        except Exception as e:
+            # Catch-all for unexpected errors
+            logger.error(f"Unexpected LLM error: {str(e)}")
+            failure = self._failure(full_prompt, f"[AI generation failed: {str(e)}]", str(e))
+        
+        if failure is not None:
+            observe_llm_call(TIER_ERROR, time.perf_counter() - start_time)
+            return failure
+        
+        # Use actual token counts from response; count locally only if missing
+        input_tokens = usage.get("prompt_tokens")
+        if input_tokens is None:
+            input_tokens = count_tokens(full_prompt)
+        output_tokens = usage.get("completion_tokens")
+        if output_tokens is None:
+            output_tokens = count_tokens(generated_text)
+        
+        self.total_tokens_used += input_tokens + output_tokens
+        self.total_requests += 1
+        
+        result = {
+            "text": generated_text,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "model": self.model,
+            "cache_hit": False
+        }
+        self._cache_put(cache_key, result)
+        if task and self.semantic_cache is not None:
+            await self.semantic_cache.put(task, prompt, result)
+        
+        observe_llm_call(TIER_NETWORK, time.perf_counter() - start_time)
+        return dict(result)
+    
+    def _failure(self, prompt: str, text: str, error: str) -> Dict[str, Any]:
+        """Build the fallback result returned when generation fails."""
+        input_tokens = count_tokens(prompt)
+        return {
+            "text": text,
+            "input_tokens": input_tokens,
+            "output_tokens": 0,
+            "total_tokens": input_tokens,
+            "model": self.model,
+            "error": error
+        }
+    
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+    
+    def _payload(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stream: bool = False,
+        system: Optional[str] = None,
+        stop: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Build an OpenAI-compatible chat completions payload."""
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
         
-        # Use OpenAI-compatible chat completions format
         payload = {
             "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
+            "messages": messages,
             "max_tokens": max_tokens,
             "temperature": temperature
         }
+        if stop:
+            payload["stop"] = stop
+        if stream:
+            payload["stream"] = True
+        return payload
+    
+    async def _complete(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system: Optional[str] = None,
+        stop: Optional[List[str]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Send a buffered completion request; returns (text, usage)."""
+        response = await self._post(
+            self._payload(prompt, max_tokens, temperature, system=system, stop=stop)
+        )
         
-        # Estimate input tokens (rough approximation: ~4 chars per token)
-        input_tokens = len(prompt) // 4
+        if response.status_code != 200:
+            raise LLMAPIError(response.status_code, response.text)
         
+        result = orjson.loads(response.content)
+        
+        # Handle OpenAI-compatible response format
+        if "choices" in result and len(result["choices"]) > 0:
+            generated_text = result["choices"][0].get("message", {}).get("content", "")
+        else:
+            generated_text = str(result)
+        
+        return generated_text, result.get("usage", {})
+    
+    async def _post(self, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        POST a completion payload, coalescing with concurrent callers.
+        
+        The first request in an empty queue arms a timer of batch_window_ms;
+        everything queued before it fires (or once batch_max_size is reached)
+        is sent at once. The Inference API takes one prompt per request, so
+        a batch is a set of concurrent POSTs multiplexed on one connection.
+        """
+        if self.batch_window_ms <= 0:
+            return await self._get_http_client().post(
+                self.base_url,
+                headers=self._headers(),
+                content=orjson.dumps(payload)
+            )
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        
+        if len(self._pending) >= self.batch_max_size:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window_ms / 1000, self._flush_pending)
+        
+        return await future
+    
+    def _flush_pending(self) -> None:
+        """Dispatch every queued payload as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _send_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Send a batch of payloads concurrently and resolve each caller's future."""
+        client = self._get_http_client()
+        headers = self._headers()
+        responses = await asyncio.gather(
+            *(
+                client.post(self.base_url, headers=headers, content=orjson.dumps(payload))
+                for payload, _ in batch
+            ),
+            return_exceptions=True
+        )
+        
+        for (_, future), response in zip(batch, responses):
+            if future.done():
+                # Caller was cancelled while waiting
+                continue
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+    
+    async def _complete_streaming(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stop_when: Callable[[str], bool],
+        system: Optional[str] = None,
+        stop: Optional[List[str]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Stream a completion, closing the connection once stop_when matches."""
+        text = ""
+        stream = self.generate_stream(prompt, max_tokens, temperature, system=system, stop=stop)
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload
-                )
+            async for delta in stream:
+                text += delta
+                if stop_when(text):
+                    break
+        finally:
+            await stream.aclose()
+        
+        # Streamed responses carry no usage block; output is estimated
+        return text, {}
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        stop: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text deltas as they arrive (server-sent events).
+        
+        Bypasses the response cache and token accounting. Raises LLMAPIError
+        on a non-200 response; closing the iterator early cancels the request.
+        """
+        async with self._get_http_client().stream(
+            "POST",
+            self.base_url,
+            headers=self._headers(),
+            content=orjson.dumps(
+                self._payload(prompt, max_tokens, temperature, stream=True, system=system, stop=stop)
+            )
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise LLMAPIError(response.status_code, body.decode("utf-8", errors="replace"))
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    continue
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Handle OpenAI-compatible response format
-                    if "choices" in result and len(result["choices"]) > 0:
-                        generated_text = result["choices"][0].get("message", {}).get("content", "")
-                    else:
-                        generated_text = str(result)
-                    
-                    # Use actual token counts from response if available
-                    usage = result.get("usage", {})
-                    input_tokens = usage.get("prompt_tokens", input_tokens)
-                    output_tokens = usage.get("completion_tokens", len(generated_text) // 4)
-                    
-                    self.total_tokens_used += input_tokens + output_tokens
-                    self.total_requests += 1
-                    
-                    return {
-                        "text": generated_text,
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens,
-                        "total_tokens": input_tokens + output_tokens,
-                        "model": self.model
-                    }
-                else:
-                    error_msg = f"HuggingFace API error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    
-                    # Return fallback with error
-                    return {
-                        "text": f"[AI generation failed: {response.status_code}]",
-                        "input_tokens": input_tokens,
-                        "output_tokens": 0,
-                        "total_tokens": input_tokens,
-                        "model": self.model,
-                        "error": error_msg
-                    }
-                    
-        except httpx.TimeoutException as e:
-            logger.error(f"LLM request timed out: {str(e)}")
-            return {
-                "text": "[AI generation failed: Request timed out]",
-                "input_tokens": input_tokens,
-                "output_tokens": 0,
-                "total_tokens": input_tokens,
-                "model": self.model,
-                "error": f"Timeout: {str(e)}"
-            }
-        except httpx.RequestError as e:
-            logger.error(f"LLM request failed: {str(e)}")
-            return {
-                "text": f"[AI generation failed: Network error]",
-                "input_tokens": input_tokens,
-                "output_tokens": 0,
-                "total_tokens": input_tokens,
-                "model": self.model,
-                "error": f"Network error: {str(e)}"
-            }
-        except Exception as e:
-            # Catch-all for unexpected errors
-            logger.error(f"Unexpected LLM error: {str(e)}")
-            return {
-                "text": f"[AI generation failed: {str(e)}]",
-                "input_tokens": input_tokens,
-                "output_tokens": 0,
-                "total_tokens": input_tokens,
-                "model": self.model,
-                "error": str(e)
-            }
+                choices = chunk.get("choices") or []
+                if choices:
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
     
     def get_stats(self) -> Dict[str, Any]:
         """Get usage statistics."""
         return {
             "total_tokens": self.total_tokens_used,
             "total_requests": self.total_requests,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self._cache),
             "model": self.model
         }
     
@@ -169,8 +565,6 @@ class HuggingFaceLLMClient:
         - response_time_ms: Response time in milliseconds
         - error: Error message if connection failed
         """
-        import time
-        
         if not self.api_key:
             return {
                 "connected": False,
@@ -196,40 +590,40 @@ class HuggingFaceLLMClient:
         start_time = time.time()
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload
-                )
-                
-                response_time_ms = int((time.time() - start_time) * 1000)
+            response = await self._get_http_client().post(
+                self.base_url,
+                headers=headers,
+                content=orjson.dumps(payload),
+                timeout=30.0
+            )
+            
+            response_time_ms = int((time.time() - start_time) * 1000)
+            
+            if response.status_code == 200:
+                return {
+                    "connected": True,
+                    "model": self.model,
+                    "response_time_ms": response_time_ms,
+                    "error": None
+                }
+            elif response.status_code == 503:
+                # Model is loading - still counts as connected
+                return {
+                    "connected": True,
+                    "model": self.model,
+                    "response_time_ms": response_time_ms,
+                    "error": "Model is loading, please wait",
+                    "loading": True
+                }
+            else:
+                error_text = response.text
+                return {
+                    "connected": False,
+                    "model": self.model,
+                    "response_time_ms": response_time_ms,
+                    "error": f"API error: {response.status_code} - {error_text[:100]}"
+                }
                 
-                if response.status_code == 200:
-                    return {
-                        "connected": True,
-                        "model": self.model,
-                        "response_time_ms": response_time_ms,
-                        "error": None
-                    }
-                elif response.status_code == 503:
-                    # Model is loading - still counts as connected
-                    return {
-                        "connected": True,
-                        "model": self.model,
-                        "response_time_ms": response_time_ms,
-                        "error": "Model is loading, please wait",
-                        "loading": True
-                    }
-                else:
-                    error_text = response.text
-                    return {
-                        "connected": False,
-                        "model": self.model,
-                        "response_time_ms": response_time_ms,
-                        "error": f"API error: {response.status_code} - {error_text[:100]}"
-                    }
-                    
         except Exception as e:
             response_time_ms = int((time.time() - start_time) * 1000)
             return {
@@ -250,3 +644,9 @@ def get_llm_client() -> HuggingFaceLLMClient:
     if _llm_client is None:
         _llm_client = HuggingFaceLLMClient()
     return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Release the singleton's pooled HTTP connections (app shutdown)."""
+    if _llm_client is not None:
+        await _llm_client.aclose()
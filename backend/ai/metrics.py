@@ -0,0 +1,52 @@
+"""
+Prometheus metrics for LLM calls.
+
+Records per-call latency and cache-tier hit counts so the cache sizes,
+semantic threshold and batching window can be tuned against real traffic.
+prometheus_client is optional; without it recording is a no-op and only
+the structured debug log line is emitted.
+"""
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# Serving tiers for a generate() call
+TIER_MEMORY = "memory_hit"
+TIER_DISK = "disk_hit"
+TIER_SEMANTIC = "semantic_hit"
+TIER_NETWORK = "network"
+TIER_ERROR = "error"
+
+try:
+    from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+    LLM_CALL_LATENCY = Histogram(
+        "llm_call_latency_seconds",
+        "Latency of LLM generate() calls by serving tier",
+        ["tier"],
+        buckets=(0.0005, 0.005, 0.05, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    )
+    LLM_CALLS = Counter(
+        "llm_calls_total",
+        "LLM generate() calls by serving tier",
+        ["tier"]
+    )
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+
+def observe_llm_call(tier: str, seconds: float) -> None:
+    """Record one generate() call served from `tier`."""
+    logger.debug(f"llm_call tier={tier} latency_ms={seconds * 1000:.2f}")
+    if METRICS_AVAILABLE:
+        LLM_CALLS.labels(tier=tier).inc()
+        LLM_CALL_LATENCY.labels(tier=tier).observe(seconds)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return (body, content type) for the /metrics endpoint."""
+    if not METRICS_AVAILABLE:
+        return b"# prometheus_client not installed\n", "text/plain; charset=utf-8"
+    return generate_latest(), CONTENT_TYPE_LATEST
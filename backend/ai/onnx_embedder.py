@@ -0,0 +1,102 @@
+"""
+ONNX Runtime backend for the RAG embedding model.
+
+Exports the sentence-transformers checkpoint to ONNX once (optionally with
+dynamic int8 quantization), caches the export on disk, and exposes the
+part of the SentenceTransformer API the RAG service uses. Requires
+optimum[onnxruntime]; the RAG service falls back to SentenceTransformer
+when it is missing.
+"""
+import logging
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Exported models, one directory per checkpoint
+ONNX_MODELS_PATH = Path(__file__).parent.parent / "onnx_models"
+
+# sentence-transformers max_seq_length for MiniLM-class models
+MAX_SEQ_LENGTH = 256
+
+QUANTIZED_FILE = "model_quantized.onnx"
+
+
+class OnnxEmbeddingModel:
+    """
+    Mean-pooled sentence embeddings from an ONNX Runtime session.
+
+    Produces the same pooling as the sentence-transformers pipeline
+    (token embeddings averaged under the attention mask).
+    """
+
+    def __init__(self, model_name: str, quantize: bool = False):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        export_dir = ONNX_MODELS_PATH / model_name.replace("/", "__")
+        if not (export_dir / "model.onnx").exists():
+            logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider="CPUExecutionProvider"
+            )
+            model.save_pretrained(export_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+        file_name = self._quantize(export_dir) if quantize else "model.onnx"
+
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir, file_name=file_name, provider="CPUExecutionProvider"
+        )
+        self.max_seq_length = min(MAX_SEQ_LENGTH, self.tokenizer.model_max_length)
+
+    @staticmethod
+    def _quantize(export_dir: Path) -> str:
+        """Write a dynamically int8-quantized copy of the export (once)."""
+        if not (export_dir / QUANTIZED_FILE).exists():
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+            logger.info(f"Quantizing {export_dir.name} to int8")
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name="model.onnx")
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=export_dir, quantization_config=qconfig)
+        return QUANTIZED_FILE
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """Embed sentences as float32 rows (SentenceTransformer.encode subset)."""
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"][..., np.newaxis].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled.astype(np.float32))
+
+        if not batches:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        embeddings = np.vstack(batches)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
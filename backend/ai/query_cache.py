@@ -0,0 +1,79 @@
+"""
+Centroid cache for RAG retrieval results.
+
+Analyst queries are frequently paraphrases of earlier ones. Each cached
+entry is a centroid of similar query embeddings plus the chunk ids and
+scores the first search returned; a new query within the similarity
+radius of a centroid reuses those results and skips the FAISS search.
+
+Entries are stored as parallel numpy arrays (centroid matrix, hit counts)
+alongside per-entry result arrays, and are dropped whenever the
+underlying corpus changes.
+"""
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCentroidCache:
+    """
+    Nearest-centroid cache for normalized query embeddings.
+
+    A hit folds the query into the centroid with an incremental mean, so
+    clusters of paraphrases drift toward their common meaning.
+    """
+
+    def __init__(self, threshold: float = 0.86, max_entries: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all centroids (call when the indexed corpus changes)."""
+        self._centroids: Optional[np.ndarray] = None
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._top_k = np.zeros(0, dtype=np.int64)
+        self._ids: List[np.ndarray] = []
+        self._scores: List[np.ndarray] = []
+
+    def get(self, query: np.ndarray, top_k: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return cached (ids, scores) for a query near a known centroid."""
+        if self._centroids is None:
+            return None
+
+        sims = self._centroids @ query
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold or self._top_k[best] < top_k:
+            return None
+
+        # Incremental mean, renormalized to stay on the unit sphere
+        count = self._counts[best] + 1
+        centroid = self._centroids[best] + (query - self._centroids[best]) / count
+        norm = np.linalg.norm(centroid)
+        if norm > 0:
+            self._centroids[best] = centroid / norm
+        self._counts[best] = count
+
+        self.hits += 1
+        return self._ids[best][:top_k], self._scores[best][:top_k]
+
+    def put(self, query: np.ndarray, top_k: int, ids: np.ndarray, scores: np.ndarray) -> None:
+        """Start a new centroid for a query that missed the cache."""
+        if self.max_entries <= 0:
+            return
+
+        if self._centroids is None:
+            self._centroids = query[np.newaxis, :].copy()
+        else:
+            self._centroids = np.vstack([self._centroids, query])[-self.max_entries:]
+        self._counts = np.append(self._counts, 1)[-self.max_entries:]
+        self._top_k = np.append(self._top_k, top_k)[-self.max_entries:]
+        self._ids = (self._ids + [ids])[-self.max_entries:]
+        self._scores = (self._scores + [scores])[-self.max_entries:]
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -6,11 +6,24 @@ Implements simple, explainable RAG:
 - Embeddings via sentence-transformers (local)
 - FAISS for vector storage and retrieval
 """
+import contextlib
+import hashlib
 import logging
+import os
+import time
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import numpy as np
+import orjson
 
+try:
+    # Optional: JIT-compiles the chunk boundary scan when installed
+    from numba import njit
+except ImportError:
+    njit = None
+
+from ai.query_cache import QueryCentroidCache
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -18,6 +31,80 @@ settings = get_settings()
 
 # FAISS index storage
 FAISS_INDEX_PATH = Path(__file__).parent.parent / "faiss_index"
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+
+# Queries are cut to roughly the embedding model's 256-token window
+MAX_QUERY_CHARS = 1024
+
+
+def _plan_chunks(
+    sentence_lens: np.ndarray,
+    word_lens: np.ndarray,
+    word_starts: np.ndarray,
+    chunk_size: int,
+    overlap_words: int,
+    keep_overlap: bool
+) -> np.ndarray:
+    """
+    Compute chunk boundaries from sentence and word lengths.
+    
+    Mirrors the chunk_text loop without touching strings. Each output row
+    is (first overlap word, first sentence, end sentence); the overlap
+    words are always the ones immediately before the first sentence.
+    """
+    n_sentences = sentence_lens.shape[0]
+    plan = np.empty((n_sentences, 3), dtype=np.int64)
+    n_chunks = 0
+    current_len = 0
+    first = -1
+    lead_start = 0
+    
+    for s in range(n_sentences):
+        length = sentence_lens[s]
+        piece = length + 2
+        if current_len + length < chunk_size:
+            if first < 0:
+                first = s
+                lead_start = word_starts[s]
+            current_len += piece
+        elif first >= 0:
+            plan[n_chunks, 0] = lead_start
+            plan[n_chunks, 1] = first
+            plan[n_chunks, 2] = s
+            n_chunks += 1
+            
+            end_word = word_starts[s]
+            if keep_overlap:
+                lead_len = 1
+                lead_start = end_word
+                if overlap_words > 0 and end_word - plan[n_chunks - 1, 0] > overlap_words:
+                    lead_start = end_word - overlap_words
+                    for w in range(lead_start, end_word):
+                        lead_len += word_lens[w] + 1
+                    lead_len -= 1
+                current_len = lead_len + piece
+            else:
+                lead_start = end_word
+                current_len = piece
+            first = s
+        else:
+            first = s
+            lead_start = word_starts[s]
+            current_len = piece
+    
+    if first >= 0:
+        plan[n_chunks, 0] = lead_start
+        plan[n_chunks, 1] = first
+        plan[n_chunks, 2] = n_sentences
+        n_chunks += 1
+    
+    return plan[:n_chunks]
+
+
+if njit is not None:
+    # Compiled once and cached on disk so restarts skip the JIT step
+    _plan_chunks = njit(cache=True)(_plan_chunks)
 
 
 class RAGService:
@@ -32,8 +119,27 @@ class RAGService:
     def __init__(self):
         self.embedding_model = None
         self.index = None
-        self.chunks: List[Dict[str, Any]] = []
+        # Chunk metadata as parallel arrays, row i <-> index vector i
+        self._chunk_ids = np.zeros(0, dtype=np.int64)
+        self._chunk_char_counts = np.zeros(0, dtype=np.int32)
+        self._chunk_texts: List[str] = []
+        self._chunk_doc_ids: List[Optional[str]] = []
         self._initialized = False
+        self._on_gpu = False
+        self._inference_mode = contextlib.nullcontext
+        self._indexed_missions: set = set()
+        self._dirty = False
+        self._last_persist = time.monotonic()
+        
+        # Embedding cache keyed by content hash (LRU)
+        self._emb_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._emb_cache_size = settings.rag_embedding_cache_size
+        
+        # Retrieval results for recent query clusters
+        self._query_cache = QueryCentroidCache(
+            threshold=settings.rag_query_cache_threshold,
+            max_entries=settings.rag_query_cache_size
+        )
         
     def _initialize(self):
         """Lazy initialization of heavy dependencies."""
@@ -41,15 +147,14 @@ class RAGService:
             return
             
         try:
-            from sentence_transformers import SentenceTransformer
             import faiss
             
             logger.info(f"Loading embedding model: {settings.embedding_model}")
-            self.embedding_model = SentenceTransformer(settings.embedding_model)
+            self.embedding_model = self._load_embedding_model()
             
-            # Initialize empty FAISS index
-            embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
-            self.index = faiss.IndexFlatL2(embedding_dim)
+            # Reuse the persisted index if present, else start empty
+            if not self._load_persisted():
+                self._reset_index()
             
             self._initialized = True
             logger.info("RAG service initialized successfully")
@@ -61,6 +166,262 @@ class RAGService:
             logger.error(f"Failed to initialize RAG service: {e}")
             self._initialized = False
     
+    def _load_embedding_model(self):
+        """Load the ONNX Runtime embedder if configured and available, else SentenceTransformer."""
+        if settings.embedding_backend == "onnx":
+            try:
+                from ai.onnx_embedder import OnnxEmbeddingModel
+                return OnnxEmbeddingModel(
+                    settings.embedding_model,
+                    quantize=settings.embedding_onnx_quantize
+                )
+            except ImportError as e:
+                logger.warning(f"ONNX Runtime backend not available ({e}), using SentenceTransformer")
+            except Exception as e:
+                logger.warning(f"ONNX export failed ({e}), using SentenceTransformer")
+        
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(settings.embedding_model)
+        self._configure_torch()
+        if settings.embedding_fp16:
+            if model.device.type == "cuda":
+                model = model.half()
+            else:
+                logger.info("EMBEDDING_FP16 ignored on CPU (half-precision inference is slower there)")
+        return model
+    
+    def _configure_torch(self):
+        """Use the available CPU cores for intra-op parallelism and skip autograd bookkeeping."""
+        import torch
+        
+        threads = settings.embedding_num_threads or max(1, (os.cpu_count() or 2) - 1)
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(2)
+        except RuntimeError:
+            # Only settable before torch starts parallel work
+            pass
+        self._inference_mode = torch.inference_mode
+        logger.info(f"Embedding on torch with {threads} threads")
+    
+    def _reset_index(self):
+        """
+        Start a fresh exact inner-product index.
+        
+        Embeddings are L2-normalized before they reach the index, so inner
+        product is cosine similarity. The index is promoted to an
+        approximate one by _maybe_upgrade_index as the corpus grows, except
+        for "fp16", which stores half-precision vectors from the start.
+        """
+        import faiss
+        
+        dim = self.embedding_model.get_sentence_embedding_dimension()
+        if settings.rag_index_type == "fp16":
+            self.index = faiss.IndexScalarQuantizer(
+                dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            self.index = faiss.IndexFlatIP(dim)
+        self._on_gpu = False
+    
+    def _load_persisted(self) -> bool:
+        """
+        Load the index and chunk metadata written by persist().
+        
+        The index is read fully into memory rather than with IO_FLAG_MMAP:
+        memory-mapped IVF lists are read-only, and the loaded index keeps
+        accepting adds.
+        """
+        import faiss
+        
+        index_file = FAISS_INDEX_PATH / INDEX_FILE
+        chunks_file = FAISS_INDEX_PATH / CHUNKS_FILE
+        if not settings.rag_persist_index or not index_file.exists() or not chunks_file.exists():
+            return False
+        
+        try:
+            index = faiss.read_index(str(index_file))
+            chunks = orjson.loads(chunks_file.read_bytes())
+        except Exception as e:
+            logger.warning(f"Could not load persisted RAG index: {e}")
+            return False
+        
+        dim = self.embedding_model.get_sentence_embedding_dimension()
+        if index.d != dim or index.ntotal != len(chunks["texts"]):
+            logger.warning("Persisted RAG index does not match the embedding model; rebuilding")
+            return False
+        
+        self.index = index
+        self._chunk_ids = np.asarray(chunks["ids"], dtype=np.int64)
+        self._chunk_char_counts = np.asarray(chunks["char_counts"], dtype=np.int32)
+        self._chunk_texts = chunks["texts"]
+        self._chunk_doc_ids = chunks["document_ids"]
+        self._indexed_missions = {d for d in self._chunk_doc_ids if d}
+        logger.info(f"Loaded persisted RAG index with {index.ntotal} chunks")
+        return True
+    
+    def persist(self):
+        """Write the index and chunk metadata to FAISS_INDEX_PATH if changed."""
+        if not settings.rag_persist_index or not self._dirty or self.index is None:
+            return
+        
+        import faiss
+        
+        index = self.index
+        if type(index).__name__.startswith("Gpu"):
+            index = faiss.index_gpu_to_cpu(index)
+        
+        try:
+            FAISS_INDEX_PATH.mkdir(parents=True, exist_ok=True)
+            # Write to temp files and rename so readers never see a partial file
+            index_tmp = FAISS_INDEX_PATH / f"{INDEX_FILE}.tmp"
+            chunks_tmp = FAISS_INDEX_PATH / f"{CHUNKS_FILE}.tmp"
+            faiss.write_index(index, str(index_tmp))
+            chunks_tmp.write_bytes(orjson.dumps({
+                "ids": self._chunk_ids,
+                "char_counts": self._chunk_char_counts,
+                "texts": self._chunk_texts,
+                "document_ids": self._chunk_doc_ids
+            }, option=orjson.OPT_SERIALIZE_NUMPY))
+            os.replace(index_tmp, FAISS_INDEX_PATH / INDEX_FILE)
+            os.replace(chunks_tmp, FAISS_INDEX_PATH / CHUNKS_FILE)
+        except Exception as e:
+            logger.warning(f"Could not persist RAG index: {e}")
+            return
+        
+        self._dirty = False
+        self._last_persist = time.monotonic()
+        logger.info(f"Persisted RAG index with {index.ntotal} chunks")
+    
+    def _maybe_persist(self):
+        """Persist at most once per rag_persist_interval seconds."""
+        self._dirty = True
+        if time.monotonic() - self._last_persist >= settings.rag_persist_interval:
+            self.persist()
+    
+    def _build_ann_index(self, vectors: np.ndarray):
+        """Build the configured approximate index over `vectors`."""
+        import faiss
+        
+        dim = vectors.shape[1]
+        nlist = max(1, int(4 * np.sqrt(len(vectors))))
+        if settings.rag_index_type == "ivf":
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.nprobe = min(16, nlist)
+        elif settings.rag_index_type == "sq8":
+            # 8-bit scalar quantization: 4x smaller than float32 rows
+            index = faiss.IndexScalarQuantizer(
+                dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+        elif settings.rag_index_type == "ivfpq":
+            # Product quantization for large corpora; sub-quantizers must divide dim
+            m = next(m for m in (48, 32, 24, 16, 8, 4, 2, 1) if dim % m == 0)
+            index = faiss.index_factory(
+                dim, f"IVF{min(nlist, 256)},PQ{m}", faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+            faiss.extract_index_ivf(index).nprobe = 16
+        else:
+            index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            index.hnsw.efSearch = 64
+        
+        index.add(vectors)
+        return index
+    
+    def _maybe_upgrade_index(self):
+        """
+        Swap the flat index for the configured one once it reaches the threshold.
+        
+        The exact index doubles as the training buffer for the quantized
+        types: their codebooks are fit on the first rag_ann_threshold vectors.
+        """
+        import faiss
+        
+        if settings.rag_index_type not in ("hnsw", "ivf", "sq8", "ivfpq"):
+            return
+        if not isinstance(self.index, faiss.IndexFlat):
+            return
+        if self.index.ntotal < settings.rag_ann_threshold:
+            return
+        
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        self.index = self._build_ann_index(vectors)
+        logger.info(f"RAG index promoted to {settings.rag_index_type} at {len(vectors)} chunks")
+    
+    def _maybe_move_to_gpu(self):
+        """
+        Move a large index to GPU 0 when faiss-gpu reports a device.
+        
+        GPU search only pays off for batched queries (see retrieve_batch);
+        indexes without a GPU implementation (HNSW) stay on CPU.
+        """
+        import faiss
+        
+        if self._on_gpu or self.index.ntotal < settings.rag_gpu_min_chunks:
+            return
+        if getattr(faiss, "get_num_gpus", lambda: 0)() <= 0:
+            return
+        
+        try:
+            self.index = faiss.index_cpu_to_gpu(faiss.StandardGpuResources(), 0, self.index)
+            logger.info(f"RAG index moved to GPU at {self.index.ntotal} chunks")
+        except Exception as e:
+            logger.warning(f"RAG index not moved to GPU: {e}")
+        self._on_gpu = True
+    
+    @property
+    def chunk_count(self) -> int:
+        """Number of indexed chunks."""
+        return len(self._chunk_texts)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as normalized float32 rows, in input order.
+        
+        Texts already seen are served from the embedding cache. The rest
+        are encoded shortest-first so each mini-batch pads to a similar
+        length, then scattered back to the caller's order.
+        """
+        keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).hexdigest() for t in texts]
+        rows: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            row = self._emb_cache.get(key)
+            if row is None:
+                missing.append(i)
+            else:
+                self._emb_cache.move_to_end(key)
+                rows[i] = row
+        
+        if missing:
+            order = sorted(missing, key=lambda i: len(texts[i]))
+            with self._inference_mode():
+                embeddings = self.embedding_model.encode(
+                    [texts[i] for i in order],
+                    batch_size=64,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+            for i, row in zip(order, embeddings):
+                rows[i] = row
+                self._cache_embedding(keys[i], row)
+        
+        return np.vstack(rows).astype(np.float32, copy=False)
+    
+    def _cache_embedding(self, key: str, row: np.ndarray):
+        """Store an embedding row, evicting the least recently used."""
+        if self._emb_cache_size <= 0:
+            return
+        self._emb_cache[key] = row
+        self._emb_cache.move_to_end(key)
+        while len(self._emb_cache) > self._emb_cache_size:
+            self._emb_cache.popitem(last=False)
+    
     def chunk_text(
         self,
         text: str,
@@ -78,46 +439,107 @@ class RAGService:
         Returns:
             List of chunk dictionaries with text and metadata
         """
+        if njit is not None:
+            return self._chunk_text_planned(text, chunk_size, overlap)
+        
         chunks = []
         
         # Split on sentence boundaries when possible
         sentences = text.replace('\n', ' ').split('. ')
         
-        current_chunk = ""
+        # Current chunk as a list of parts plus its running length
+        parts: List[str] = []
+        current_len = 0
         chunk_id = 0
+        overlap_words = overlap // 5
+        
+        def flush():
+            chunk = "".join(parts)
+            chunks.append({
+                "id": chunk_id,
+                "text": chunk.strip(),
+                "char_count": current_len
+            })
         
         for sentence in sentences:
             sentence = sentence.strip()
             if not sentence:
                 continue
+            
+            piece = sentence + ". "
+            if current_len + len(sentence) < chunk_size:
+                parts.append(piece)
+                current_len += len(piece)
+            elif parts:
+                flush()
+                chunk_id += 1
                 
-            if len(current_chunk) + len(sentence) < chunk_size:
-                current_chunk += sentence + ". "
-            else:
-                if current_chunk:
-                    chunks.append({
-                        "id": chunk_id,
-                        "text": current_chunk.strip(),
-                        "char_count": len(current_chunk)
-                    })
-                    chunk_id += 1
-                    
-                    # Keep overlap from end of previous chunk
-                    if overlap > 0:
-                        words = current_chunk.split()
-                        overlap_words = words[-overlap//5:] if len(words) > overlap//5 else []
-                        current_chunk = " ".join(overlap_words) + " " + sentence + ". "
-                    else:
-                        current_chunk = sentence + ". "
+                # Keep overlap from end of previous chunk, scanning only
+                # as many trailing parts as the overlap needs
+                tail: List[str] = []
+                if overlap > 0 and overlap_words > 0:
+                    for part in reversed(parts):
+                        tail[:0] = part.split()
+                        if len(tail) > overlap_words:
+                            break
+                    tail = tail[-overlap_words:] if len(tail) > overlap_words else []
+                
+                if overlap > 0:
+                    lead = " ".join(tail) + " "
+                    parts = [lead, piece]
+                    current_len = len(lead) + len(piece)
                 else:
-                    current_chunk = sentence + ". "
+                    parts = [piece]
+                    current_len = len(piece)
+            else:
+                parts = [piece]
+                current_len = len(piece)
         
         # Add final chunk
-        if current_chunk.strip():
+        if parts and "".join(parts).strip():
+            flush()
+        
+        return chunks
+    
+    def _chunk_text_planned(
+        self,
+        text: str,
+        chunk_size: int,
+        overlap: int
+    ) -> List[Dict[str, Any]]:
+        """
+        chunk_text via the compiled boundary scan.
+        
+        Strings are split and measured once up front; _plan_chunks works on
+        the length arrays and substrings are joined once per chunk.
+        """
+        pieces = [s + ". " for s in (s.strip() for s in text.replace('\n', ' ').split('. ')) if s]
+        if not pieces:
+            return []
+        
+        word_counts = [len(p.split()) for p in pieces]
+        words = "".join(pieces).split()
+        word_starts = np.zeros(len(pieces) + 1, dtype=np.int64)
+        np.cumsum(word_counts, out=word_starts[1:])
+        
+        plan = _plan_chunks(
+            np.fromiter((len(p) - 2 for p in pieces), dtype=np.int64, count=len(pieces)),
+            np.fromiter(map(len, words), dtype=np.int64, count=len(words)),
+            word_starts,
+            chunk_size,
+            overlap // 5,
+            overlap > 0
+        )
+        
+        chunks = []
+        for chunk_id, (lead_start, first, end) in enumerate(plan.tolist()):
+            body = "".join(pieces[first:end])
+            if chunk_id > 0 and overlap > 0:
+                body = " ".join(words[lead_start:word_starts[first]]) + " " + body
             chunks.append({
                 "id": chunk_id,
-                "text": current_chunk.strip(),
-                "char_count": len(current_chunk)
+                "text": body.strip(),
+                "char_count": len(body)
             })
         
         return chunks
@@ -139,21 +561,57 @@ class RAGService:
         if not chunks:
             return 0
         
-        # Generate embeddings
+        # Generate embeddings, normalized so inner product is cosine
         texts = [c["text"] for c in chunks]
-        embeddings = self.embedding_model.encode(texts)
+        embeddings = self._encode(texts)
         
         # Add to FAISS index
-        self.index.add(np.array(embeddings).astype('float32'))
+        self.index.add(embeddings)
+        self._maybe_upgrade_index()
+        self._maybe_move_to_gpu()
+        self._query_cache.clear()
         
         # Store chunk references
-        for i, chunk in enumerate(chunks):
-            chunk["document_id"] = document_id
-            self.chunks.append(chunk)
+        self._chunk_ids = np.concatenate([self._chunk_ids, [c["id"] for c in chunks]]).astype(np.int64)
+        self._chunk_char_counts = np.concatenate(
+            [self._chunk_char_counts, [c["char_count"] for c in chunks]]
+        ).astype(np.int32)
+        self._chunk_texts.extend(texts)
+        self._chunk_doc_ids.extend([document_id] * len(chunks))
+        
+        self._maybe_persist()
         
         logger.info(f"Added {len(chunks)} chunks to RAG index")
         return len(chunks)
     
+    def index_mission(self, content: str, mission_id: str) -> int:
+        """
+        Add a mission's content to the corpus, once per mission.
+        
+        Returns number of chunks added (0 if already indexed).
+        """
+        if mission_id in self._indexed_missions:
+            return 0
+        
+        added = self.add_document(content, document_id=mission_id)
+        if added:
+            self._indexed_missions.add(mission_id)
+        return added
+    
+    def embed_query(self, text: str) -> Optional[np.ndarray]:
+        """
+        Embed one text with the corpus model (normalized float32).
+        
+        Returns None when the embedding model is unavailable. Blocking;
+        async callers should run it in a worker thread.
+        """
+        self._initialize()
+        
+        if not self._initialized:
+            return None
+        
+        return self._encode([text])[0]
+    
     def retrieve(
         self,
         query: str,
@@ -167,28 +625,71 @@ class RAGService:
             top_k: Number of results to return
             
         Returns:
-            List of relevant chunks with scores
+            List of relevant chunks with cosine similarity scores
         """
         self._initialize()
         
-        if not self._initialized or not self.chunks:
+        if not self._initialized or not self.chunk_count:
             return []
         
         # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])
+        query_embedding = self._encode([query[:MAX_QUERY_CHARS]])
         
-        # Search FAISS
-        distances, indices = self.index.search(
-            np.array(query_embedding).astype('float32'),
-            min(top_k, len(self.chunks))
-        )
+        # Paraphrases of a recent query reuse its results
+        cached = self._query_cache.get(query_embedding[0], top_k)
+        if cached is not None:
+            indices, scores = cached
+        else:
+            # Search FAISS
+            scores, indices = self.index.search(
+                query_embedding,
+                min(top_k, self.chunk_count)
+            )
+            indices, scores = indices[0], scores[0]
+            self._query_cache.put(query_embedding[0], top_k, indices, scores)
+        
+        return self._build_results(indices, scores)
+    
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: int = 3
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve context for several queries with one index search.
+        
+        Encodes all queries together and issues a single search, which is
+        where GPU (and batched CPU) search outperforms per-query calls.
+        
+        Returns:
+            One result list per query, in input order
+        """
+        self._initialize()
+        
+        if not queries:
+            return []
+        if not self._initialized or not self.chunk_count:
+            return [[] for _ in queries]
         
+        query_embeddings = self._encode([q[:MAX_QUERY_CHARS] for q in queries])
+        scores, indices = self.index.search(
+            query_embeddings,
+            min(top_k, self.chunk_count)
+        )
+        return [self._build_results(indices[i], scores[i]) for i in range(len(queries))]
+    
+    def _build_results(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Turn index search output into chunk dicts with scores."""
         results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.chunks):
-                chunk = self.chunks[idx].copy()
-                chunk["score"] = float(distances[0][i])
-                results.append(chunk)
+        for i, idx in enumerate(indices):
+            if 0 <= idx < self.chunk_count:
+                results.append({
+                    "id": int(self._chunk_ids[idx]),
+                    "text": self._chunk_texts[idx],
+                    "char_count": int(self._chunk_char_counts[idx]),
+                    "document_id": self._chunk_doc_ids[idx],
+                    "score": float(scores[i])
+                })
         
         return results
     
@@ -200,13 +701,16 @@ class RAGService:
         """
         Get relevant context for analyzing new content.
         
-        This adds the content to the index and retrieves related context.
+        Only searches the existing corpus; missions are added separately
+        via index_mission once their analysis completes.
         """
-        # Add content to index
-        self.add_document(content)
-        
-        # Create query from first part of content
-        query = content[:500]
+        # Query with the content's first chunk - the same text index_mission
+        # embeds first, so indexing the mission later hits the embedding cache.
+        # Two chunk lengths of content are enough to reproduce that chunk.
+        head = self.chunk_text(content[:2000])
+        if not head:
+            return ""
+        query = head[0]["text"]
         
         # Retrieve related chunks
         results = self.retrieve(query, top_k=3)
@@ -225,9 +729,15 @@ class RAGService:
     
     def clear(self):
         """Clear the RAG index."""
-        if self._initialized and self.index:
-            self.index.reset()
-        self.chunks = []
+        if self._initialized and self.index is not None:
+            self._reset_index()
+        self._chunk_ids = np.zeros(0, dtype=np.int64)
+        self._chunk_char_counts = np.zeros(0, dtype=np.int32)
+        self._chunk_texts = []
+        self._chunk_doc_ids = []
+        self._indexed_missions.clear()
+        self._query_cache.clear()
+        self._maybe_persist()
 
 
 # Global RAG service instance
@@ -0,0 +1,88 @@
+"""
+Semantic response cache for LLM calls.
+
+Near-duplicate prompts (whitespace changes, reordered bullets) miss the
+exact-match cache. This cache embeds each prompt with the local
+sentence-transformers model used by the RAG service and returns a stored
+response when cosine similarity exceeds a threshold.
+
+Entries are partitioned by task (summarize, classify_risk, ...) so a
+response for one prompt type is never served for another.
+"""
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Embedding-based response cache with per-task partitions.
+
+    Embeddings are L2-normalized on insert, so similarity is a single
+    matrix-vector product per lookup.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512, rag_service=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._rag_service = rag_service
+        self._keys: Dict[str, np.ndarray] = {}
+        self._values: Dict[str, List[Dict[str, Any]]] = {}
+        self.hits = 0
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text with the RAG service model; None if unavailable."""
+        if self._rag_service is None:
+            from ai.rag_service import get_rag_service
+            self._rag_service = get_rag_service()
+
+        embedding = self._rag_service.embed_query(text)
+        if embedding is None:
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    async def get(self, task: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response for a semantically equivalent prompt."""
+        keys = self._keys.get(task)
+        if keys is None or len(keys) == 0:
+            return None
+
+        # Encoding is CPU-bound; keep it off the event loop
+        query = await asyncio.to_thread(self._embed, prompt)
+        if query is None:
+            return None
+
+        sims = keys @ query
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+
+        self.hits += 1
+        return {**self._values[task][best], "cache_hit": True, "similarity": round(float(sims[best]), 4)}
+
+    async def put(self, task: str, prompt: str, result: Dict[str, Any]) -> None:
+        """Store a response under the prompt's embedding."""
+        if self.max_entries <= 0:
+            return
+
+        vector = await asyncio.to_thread(self._embed, prompt)
+        if vector is None:
+            return
+
+        keys = self._keys.get(task)
+        if keys is None:
+            self._keys[task] = vector[np.newaxis, :]
+            self._values[task] = [result]
+        else:
+            self._keys[task] = np.vstack([keys, vector])[-self.max_entries:]
+            self._values[task] = (self._values[task] + [result])[-self.max_entries:]
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._values.values())
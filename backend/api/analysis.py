@@ -3,11 +3,12 @@ Analysis API - endpoints for executing and retrieving AI analysis.
 """
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional, List, Any
 from datetime import datetime
 
 from db import get_session
+from models.mission import Mission
 from services import get_mission, run_analysis, get_analysis_result, get_all_analysis_results
 
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
@@ -15,6 +16,8 @@ router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
 # Response models
 class AnalysisResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     analysis_id: str
     mission_id: str
     summary_text: Optional[str]
@@ -24,12 +27,20 @@ class AnalysisResponse(BaseModel):
     llm_model_used: Optional[str]
     total_tokens: int
     estimated_cost: float
+    cached_tokens: int = 0
     confidence_score: Optional[float]
     processing_time_ms: Optional[int]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    @field_validator("extracted_entities", mode="before")
+    @classmethod
+    def _entities_or_empty(cls, value):
+        return value or []
+    
+    @field_validator("cached_tokens", mode="before")
+    @classmethod
+    def _cached_tokens_or_zero(cls, value):
+        return value or 0
 
 
 class AnalysisCostInfo(BaseModel):
@@ -37,6 +48,7 @@ class AnalysisCostInfo(BaseModel):
     output_tokens: int
     total_tokens: int
     estimated_cost: float
+    cached_tokens: int = 0
     model: str
 
 
@@ -65,11 +77,6 @@ async def execute_analysis(
     
     Cost transparency: Token usage and cost estimates are included in the response.
     """
-    # Verify mission exists
-    mission = await get_mission(session, mission_id)
-    if not mission:
-        raise HTTPException(status_code=404, detail="Mission not found")
-    
     # Import AI components
     from ai.llm_client import get_llm_client
     from ai.rag_service import get_rag_service
@@ -77,7 +84,8 @@ async def execute_analysis(
     llm_client = get_llm_client()
     rag_service = get_rag_service() if request.use_rag else None
     
-    # Run analysis
+    # Run analysis (run_analysis loads the mission itself, so existence is
+    # only checked again when it fails)
     result = await run_analysis(
         session=session,
         mission_id=mission_id,
@@ -86,25 +94,15 @@ async def execute_analysis(
     )
     
     if not result:
+        if not await get_mission(session, mission_id, (Mission.mission_id,)):
+            raise HTTPException(status_code=404, detail="Mission not found")
         raise HTTPException(
             status_code=500,
             detail="Analysis failed. Check mission status for details."
         )
     
-    return AnalysisResponse(
-        analysis_id=str(result.analysis_id),
-        mission_id=str(result.mission_id),
-        summary_text=result.summary_text,
-        extracted_entities=result.extracted_entities or [],
-        risk_level=result.risk_level if isinstance(result.risk_level, str) else (result.risk_level.value if result.risk_level else None),
-        explanation=result.explanation,
-        llm_model_used=result.llm_model_used,
-        total_tokens=result.total_tokens,
-        estimated_cost=result.estimated_cost,
-        confidence_score=result.confidence_score,
-        processing_time_ms=result.processing_time_ms,
-        created_at=result.created_at
-    )
+    # The inserted row came back via RETURNING; serialize it directly
+    return AnalysisResponse.model_validate(result)
 
 
 @router.get("/{mission_id}", response_model=AnalysisDetailResponse)
@@ -135,6 +133,7 @@ async def get_analysis(
         llm_model_used=result.llm_model_used,
         total_tokens=result.total_tokens,
         estimated_cost=result.estimated_cost,
+        cached_tokens=result.cached_tokens or 0,
         confidence_score=result.confidence_score,
         processing_time_ms=result.processing_time_ms,
         created_at=result.created_at,
@@ -143,6 +142,7 @@ async def get_analysis(
             output_tokens=result.output_tokens,
             total_tokens=result.total_tokens,
             estimated_cost=result.estimated_cost,
+            cached_tokens=result.cached_tokens or 0,
             model=result.llm_model_used or "unknown"
         )
     )
@@ -158,20 +158,4 @@ async def get_analysis_history(
     """
     results = await get_all_analysis_results(session, mission_id)
     
-    return [
-        AnalysisResponse(
-            analysis_id=str(r.analysis_id),
-            mission_id=str(r.mission_id),
-            summary_text=r.summary_text,
-            extracted_entities=r.extracted_entities or [],
-            risk_level=r.risk_level if isinstance(r.risk_level, str) else (r.risk_level.value if r.risk_level else None),
-            explanation=r.explanation,
-            llm_model_used=r.llm_model_used,
-            total_tokens=r.total_tokens,
-            estimated_cost=r.estimated_cost,
-            confidence_score=r.confidence_score,
-            processing_time_ms=r.processing_time_ms,
-            created_at=r.created_at
-        )
-        for r in results
-    ]
+    return [AnalysisResponse.model_validate(r) for r in results]
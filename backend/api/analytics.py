@@ -2,16 +2,18 @@
 Analytics API endpoints for dashboard data.
 Provides aggregated mission statistics, trends, and risk distribution.
 """
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, List
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
-from sqlalchemy import func, case, extract
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, case, extract, text, bindparam, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from db.database import get_session
+from db.database import get_session, get_session_factory
 from models.mission import Mission
 from models.analysis import AnalysisResult
+from services.analytics_cache import analytics_cache
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -55,40 +57,43 @@ class TrendsResponse(BaseModel):
     period_end: str
 
 
+async def _fetch_all(session_factory: async_sessionmaker, *queries) -> list:
+    """
+    Run independent read queries concurrently.
+    
+    An AsyncSession serializes statements on one connection, so each query
+    gets its own short-lived session. Returns one row list per query.
+    """
+    async def fetch(query):
+        async with session_factory() as session:
+            result = await session.execute(query)
+            return result.all()
+    
+    return await asyncio.gather(*(fetch(query) for query in queries))
+
+
 # ============== Endpoints ==============
 
 @router.get("/summary", response_model=AnalyticsSummary)
 async def get_analytics_summary(
-    session: AsyncSession = Depends(get_session)
+    session_factory: async_sessionmaker = Depends(get_session_factory)
 ):
     """
     Get overall analytics summary.
     Returns aggregated stats across all missions and analyses.
     """
-    # Count missions by status
-    from sqlalchemy import select
-    
-    total_query = select(func.count(Mission.mission_id))
-    total_result = await session.execute(total_query)
-    total_missions = total_result.scalar() or 0
+    cached = analytics_cache.get(("summary",))
+    if cached is not None:
+        return cached
     
-    analyzed_query = select(func.count(Mission.mission_id)).where(
-        func.lower(Mission.status) == 'analyzed'
-    )
-    analyzed_result = await session.execute(analyzed_query)
-    total_analyzed = analyzed_result.scalar() or 0
+    from sqlalchemy import select
     
-    pending_query = select(func.count(Mission.mission_id)).where(
-        func.lower(Mission.status).in_(['pending', 'ingested', 'analyzing'])
-    )
-    pending_result = await session.execute(pending_query)
-    total_pending = pending_result.scalar() or 0
-    
-    error_query = select(func.count(Mission.mission_id)).where(
-        func.lower(Mission.status) == 'error'
-    )
-    error_result = await session.execute(error_query)
-    total_errors = error_result.scalar() or 0
+    # Count missions by status in one grouped query
+    status = func.lower(Mission.status)
+    status_query = select(
+        status.label('status'),
+        func.count(Mission.mission_id).label('count')
+    ).group_by(status)
     
     # Aggregate analysis stats
     analysis_stats = select(
@@ -97,10 +102,17 @@ async def get_analytics_summary(
         func.avg(AnalysisResult.processing_time_ms).label('avg_processing_time'),
         func.avg(AnalysisResult.confidence_score).label('avg_confidence')
     )
-    stats_result = await session.execute(analysis_stats)
-    stats = stats_result.first()
     
-    return AnalyticsSummary(
+    status_rows, stats_rows = await _fetch_all(session_factory, status_query, analysis_stats)
+    status_counts = {row.status: row.count for row in status_rows}
+    stats = stats_rows[0]
+    
+    total_missions = sum(status_counts.values())
+    total_analyzed = status_counts.get('analyzed', 0)
+    total_pending = sum(status_counts.get(s, 0) for s in ('pending', 'ingested', 'analyzing'))
+    total_errors = status_counts.get('error', 0)
+    
+    summary = AnalyticsSummary(
         total_missions=total_missions,
         total_analyzed=total_analyzed,
         total_pending=total_pending,
@@ -110,6 +122,8 @@ async def get_analytics_summary(
         avg_processing_time_ms=float(stats.avg_processing_time) if stats.avg_processing_time else None,
         avg_confidence_score=float(stats.avg_confidence) if stats.avg_confidence else None
     )
+    analytics_cache.put(("summary",), summary)
+    return summary
 
 
 @router.get("/risk-distribution", response_model=RiskDistribution)
@@ -149,6 +163,35 @@ async def get_risk_distribution(
     return RiskDistribution(**distribution)
 
 
+# Daily mission counts joined with analysis totals in one round trip.
+# Days with only missions or only analyses are both kept; the LEFT JOIN +
+# UNION ALL form is a FULL OUTER JOIN that also runs on SQLite < 3.39.
+_TRENDS_SQL = text("""
+    WITH m AS (
+        SELECT date(ingestion_timestamp) AS d, count(*) AS mission_count
+        FROM missions
+        WHERE ingestion_timestamp >= :start
+        GROUP BY date(ingestion_timestamp)
+    ), a AS (
+        SELECT date(created_at) AS d,
+               sum(total_tokens) AS tokens,
+               sum(estimated_cost) AS cost,
+               avg(processing_time_ms) AS avg_processing_time
+        FROM analysis_results
+        WHERE created_at >= :start
+        GROUP BY date(created_at)
+    )
+    SELECT m.d AS date, m.mission_count,
+           COALESCE(a.tokens, 0) AS tokens, COALESCE(a.cost, 0.0) AS cost,
+           a.avg_processing_time
+    FROM m LEFT JOIN a ON a.d = m.d
+    UNION ALL
+    SELECT a.d, 0, COALESCE(a.tokens, 0), COALESCE(a.cost, 0.0), a.avg_processing_time
+    FROM a WHERE a.d NOT IN (SELECT d FROM m)
+    ORDER BY 1
+""").bindparams(bindparam("start", type_=DateTime))
+
+
 @router.get("/trends", response_model=TrendsResponse)
 async def get_analytics_trends(
     days: int = Query(default=30, ge=1, le=365),
@@ -157,60 +200,33 @@ async def get_analytics_trends(
     """
     Get daily trends for the specified number of days.
     """
-    from sqlalchemy import select, cast, Date
+    cached = analytics_cache.get(("trends", days))
+    if cached is not None:
+        return cached
     
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Query missions grouped by date
-    query = select(
-        func.date(Mission.ingestion_timestamp).label('date'),
-        func.count(Mission.mission_id).label('mission_count')
-    ).where(
-        Mission.ingestion_timestamp >= start_date
-    ).group_by(
-        func.date(Mission.ingestion_timestamp)
-    ).order_by(
-        func.date(Mission.ingestion_timestamp)
-    )
+    result = await session.execute(_TRENDS_SQL, {"start": start_date})
     
-    mission_result = await session.execute(query)
-    mission_rows = mission_result.all()
-    
-    # Query analysis stats grouped by date
-    analysis_query = select(
-        func.date(AnalysisResult.created_at).label('date'),
-        func.coalesce(func.sum(AnalysisResult.total_tokens), 0).label('tokens'),
-        func.coalesce(func.sum(AnalysisResult.estimated_cost), 0.0).label('cost'),
-        func.avg(AnalysisResult.processing_time_ms).label('avg_processing_time')
-    ).where(
-        AnalysisResult.created_at >= start_date
-    ).group_by(
-        func.date(AnalysisResult.created_at)
-    )
-    
-    analysis_result = await session.execute(analysis_query)
-    analysis_rows = {str(row.date): row for row in analysis_result.all()}
-    
-    # Combine data
-    daily_trends = []
-    for row in mission_rows:
-        date_str = str(row.date)
-        analysis_data = analysis_rows.get(date_str)
-        
-        daily_trends.append(DailyTrend(
-            date=date_str,
+    daily_trends = [
+        DailyTrend(
+            date=str(row.date),
             mission_count=row.mission_count,
-            tokens_used=int(analysis_data.tokens) if analysis_data else 0,
-            estimated_cost=float(analysis_data.cost) if analysis_data else 0.0,
-            avg_processing_time_ms=float(analysis_data.avg_processing_time) if analysis_data and analysis_data.avg_processing_time else None
-        ))
-    
-    return TrendsResponse(
+            tokens_used=int(row.tokens),
+            estimated_cost=float(row.cost),
+            avg_processing_time_ms=float(row.avg_processing_time) if row.avg_processing_time else None
+        )
+        for row in result.all()
+    ]
+    
+    trends = TrendsResponse(
         days=daily_trends,
         period_start=start_date.strftime('%Y-%m-%d'),
         period_end=end_date.strftime('%Y-%m-%d')
     )
+    analytics_cache.put(("trends", days), trends)
+    return trends
 
 
 # ============== New Command Center Endpoints ==============
@@ -251,6 +267,33 @@ class HighRiskMissionsResponse(BaseModel):
     total_high_risk: int
 
 
+# Entity type counts computed in the database, per dialect
+_ENTITY_COUNTS_SQL = {
+    "sqlite": text("""
+        SELECT upper(json_extract(e.value, '$.type')) AS entity_type, count(*) AS count
+        FROM analysis_results, json_each(analysis_results.extracted_entities) AS e
+        WHERE json_type(analysis_results.extracted_entities) = 'array'
+          AND e.type = 'object'
+          AND json_extract(e.value, '$.type') IS NOT NULL
+        GROUP BY entity_type
+        ORDER BY count DESC, entity_type
+    """),
+    # extracted_entities is JSONB on new PostgreSQL databases but JSON on
+    # older ones; the ::jsonb casts make the query work for either
+    "postgresql": text("""
+        SELECT upper(elem->>'type') AS entity_type, count(*) AS count
+        FROM analysis_results
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(extracted_entities::jsonb) = 'array'
+                 THEN extracted_entities::jsonb ELSE '[]'::jsonb END
+        ) AS elem
+        WHERE jsonb_typeof(elem) = 'object' AND elem->>'type' IS NOT NULL
+        GROUP BY entity_type
+        ORDER BY count DESC, entity_type
+    """),
+}
+
+
 @router.get("/entity-breakdown", response_model=EntityBreakdownResponse)
 async def get_entity_breakdown(
     session: AsyncSession = Depends(get_session)
@@ -259,6 +302,21 @@ async def get_entity_breakdown(
     Get breakdown of extracted entities by type.
     Aggregates entity types across all analyses.
     """
+    count_sql = _ENTITY_COUNTS_SQL.get(session.bind.dialect.name)
+    if count_sql is not None:
+        result = await session.execute(count_sql)
+        sorted_types = [(row.entity_type, row.count) for row in result.all()]
+    else:
+        sorted_types = await _count_entity_types_python(session)
+    
+    return EntityBreakdownResponse(
+        entities=[EntityTypeCount(entity_type=t, count=c) for t, c in sorted_types],
+        total_entities=sum(c for _, c in sorted_types)
+    )
+
+
+async def _count_entity_types_python(session: AsyncSession) -> list:
+    """Count entity types in Python for dialects without JSON table functions."""
     from sqlalchemy import select
     import json
     
@@ -269,7 +327,6 @@ async def get_entity_breakdown(
     
     # Count entity types
     type_counts = {}
-    total = 0
     
     for row in rows:
         entities = row.extracted_entities
@@ -285,20 +342,14 @@ async def get_entity_breakdown(
                 if isinstance(entity, dict) and 'type' in entity:
                     entity_type = entity['type'].upper()
                     type_counts[entity_type] = type_counts.get(entity_type, 0) + 1
-                    total += 1
     
     # Sort by count descending
-    sorted_types = sorted(type_counts.items(), key=lambda x: x[1], reverse=True)
-    
-    return EntityBreakdownResponse(
-        entities=[EntityTypeCount(entity_type=t, count=c) for t, c in sorted_types],
-        total_entities=total
-    )
+    return sorted(type_counts.items(), key=lambda x: x[1], reverse=True)
 
 
 @router.get("/review-status", response_model=ReviewStatusResponse)
 async def get_review_status(
-    session: AsyncSession = Depends(get_session)
+    session_factory: async_sessionmaker = Depends(get_session_factory)
 ):
     """
     Get review status counts across all missions.
@@ -308,22 +359,23 @@ async def get_review_status(
     
     # Get all missions
     total_query = select(func.count(Mission.mission_id))
-    total_result = await session.execute(total_query)
-    total = total_result.scalar() or 0
     
     # Get approved count
     approved_query = select(func.count(AnalystReview.review_id)).where(
         AnalystReview.approved == True
     )
-    approved_result = await session.execute(approved_query)
-    approved = approved_result.scalar() or 0
     
     # Get reviewed but not approved count
     pending_review_query = select(func.count(AnalystReview.review_id)).where(
         AnalystReview.approved == False
     )
-    pending_result = await session.execute(pending_review_query)
-    pending_review = pending_result.scalar() or 0
+    
+    total_rows, approved_rows, pending_rows = await _fetch_all(
+        session_factory, total_query, approved_query, pending_review_query
+    )
+    total = total_rows[0][0] or 0
+    approved = approved_rows[0][0] or 0
+    pending_review = pending_rows[0][0] or 0
     
     # Calculate not reviewed
     reviewed_total = approved + pending_review
@@ -346,13 +398,23 @@ async def get_high_risk_missions(
     Get recent high-risk and critical-risk missions.
     """
     from sqlalchemy import select
-    from sqlalchemy.orm import joinedload
     
-    # Query for high/critical risk analyses with their missions
-    query = select(AnalysisResult, Mission).join(
-        Mission, AnalysisResult.mission_id == Mission.mission_id
+    # Project only the displayed columns; the window count reports the
+    # total before LIMIT so no separate COUNT query is needed.
+    # risk_level is stored lower-case (see init_db).
+    query = select(
+        Mission.mission_id,
+        Mission.source_label,
+        Mission.filename,
+        Mission.ingestion_timestamp,
+        AnalysisResult.risk_level,
+        AnalysisResult.summary_text,
+        AnalysisResult.confidence_score,
+        func.count().over().label('total_high_risk')
+    ).join(
+        AnalysisResult, AnalysisResult.mission_id == Mission.mission_id
     ).where(
-        AnalysisResult.risk_level.in_(['HIGH', 'CRITICAL', 'high', 'critical'])
+        AnalysisResult.risk_level.in_(['high', 'critical'])
     ).order_by(
         Mission.ingestion_timestamp.desc()
     ).limit(limit)
@@ -361,30 +423,22 @@ async def get_high_risk_missions(
     rows = result.all()
     
     missions = []
-    for analysis, mission in rows:
+    for row in rows:
         # Truncate summary if too long
-        summary = analysis.summary
+        summary = row.summary_text
         if summary and len(summary) > 150:
             summary = summary[:150] + '...'
         
         missions.append(HighRiskMission(
-            mission_id=str(mission.mission_id),
-            source_label=mission.source_label or mission.filename or 'Unknown',
-            risk_level=analysis.risk_level.upper() if analysis.risk_level else 'UNKNOWN',
+            mission_id=str(row.mission_id),
+            source_label=row.source_label or row.filename or 'Unknown',
+            risk_level=row.risk_level.upper(),
             summary=summary,
-            ingestion_timestamp=mission.ingestion_timestamp.strftime('%Y-%m-%d %H:%M'),
-            confidence_score=analysis.confidence_score
+            ingestion_timestamp=row.ingestion_timestamp.strftime('%Y-%m-%d %H:%M'),
+            confidence_score=row.confidence_score
         ))
     
-    # Count total high risk
-    count_query = select(func.count(AnalysisResult.analysis_id)).where(
-        AnalysisResult.risk_level.in_(['HIGH', 'CRITICAL', 'high', 'critical'])
-    )
-    count_result = await session.execute(count_query)
-    total = count_result.scalar() or 0
-    
     return HighRiskMissionsResponse(
         missions=missions,
-        total_high_risk=total
+        total_high_risk=rows[0].total_high_risk if rows else 0
     )
-
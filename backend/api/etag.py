@@ -0,0 +1,33 @@
+"""
+Conditional GET support for read-mostly resources.
+
+Responses carry a strong ETag (blake2b of the serialized body) and
+"Cache-Control: private, no-cache", so clients revalidate on every use
+but an unchanged resource costs a 304 with no body.
+"""
+import hashlib
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def etag_response(request: Request, payload: BaseModel) -> Response:
+    """Serialize payload once, answering 304 when the client's copy is current."""
+    body = payload.model_dump_json().encode()
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
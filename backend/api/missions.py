@@ -1,42 +1,74 @@
 """
 Missions API - endpoints for file upload, text submission, and mission retrieval.
 """
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+import os
+
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
+from api.etag import etag_response
+from config import get_settings
 from db import get_session
 from models.mission import SourceType, MissionStatus
 from services import (
     create_mission_from_file,
     create_mission_from_text,
-    get_mission,
+    get_mission_preview,
+    get_mission_content,
     get_all_missions,
+    encode_mission_cursor,
+    decode_mission_cursor,
     delete_mission
 )
 
 router = APIRouter(prefix="/api/missions", tags=["missions"])
 
+settings = get_settings()
+
+# Characters per chunk when streaming mission content
+CONTENT_CHUNK_CHARS = 64 * 1024
+
+# Accepted upload extensions
+UPLOAD_SOURCE_TYPES = {
+    ".pdf": SourceType.PDF,
+    ".csv": SourceType.CSV,
+    ".txt": SourceType.TEXT,
+}
+
+# Mission.filename column width
+MAX_FILENAME_LENGTH = 255
+
 
 # Pydantic response models
 class MissionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+    
     mission_id: str
     source_type: str
     filename: Optional[str]
     source_label: Optional[str]
     status: str
     ingestion_timestamp: datetime
-    metadata: dict
+    # Read from Mission.mission_metadata (Mission.metadata is the ORM MetaData)
+    metadata: dict = Field(validation_alias="mission_metadata")
     error_message: Optional[str]
+    analysis_count: int = 0
+    review_count: int = 0
     
-    class Config:
-        from_attributes = True
+    @field_validator("metadata", mode="before")
+    @classmethod
+    def _metadata_or_empty(cls, value):
+        return value or {}
 
 
 class MissionDetailResponse(MissionResponse):
     normalized_content: Optional[str]
+    content_length: int = 0
+    content_truncated: bool = False
 
 
 class TextSubmissionRequest(BaseModel):
@@ -47,6 +79,8 @@ class TextSubmissionRequest(BaseModel):
 class MissionListResponse(BaseModel):
     missions: List[MissionResponse]
     total: int
+    # Pass as `before` for the next page (None on the last page)
+    next_cursor: Optional[str] = None
 
 
 @router.post("/upload", response_model=MissionResponse)
@@ -57,41 +91,34 @@ async def upload_file(
     """
     Upload a PDF, CSV, or TXT file for mission intake.
     """
-    # Validate file type
     filename = file.filename or "unknown"
-    if filename.lower().endswith(".pdf"):
-        source_type = SourceType.PDF
-    elif filename.lower().endswith(".csv"):
-        source_type = SourceType.CSV
-    elif filename.lower().endswith(".txt"):
-        source_type = SourceType.TEXT
-    else:
+    if len(filename) > MAX_FILENAME_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Filename exceeds {MAX_FILENAME_LENGTH} characters."
+        )
+    
+    # Validate file type
+    source_type = UPLOAD_SOURCE_TYPES.get(os.path.splitext(filename)[1].lower())
+    if source_type is None:
         raise HTTPException(
             status_code=400,
             detail="Unsupported file type. Please upload PDF, CSV, or TXT files."
         )
     
-    # Read file content
-    content = await file.read()
+    # Parse straight from Starlette's spooled temp file (on disk past 1 MB)
+    # instead of copying the whole upload into memory with file.read()
+    await file.seek(0)
     
     # Create mission
     mission = await create_mission_from_file(
         session=session,
-        file_content=content,
+        file_content=file.file,
         filename=filename,
         source_type=source_type
     )
     
-    return MissionResponse(
-        mission_id=str(mission.mission_id),
-        source_type=mission.source_type,
-        filename=mission.filename,
-        source_label=mission.source_label,
-        status=mission.status,
-        ingestion_timestamp=mission.ingestion_timestamp,
-        metadata=mission.mission_metadata or {},
-        error_message=mission.error_message
-    )
+    return MissionResponse.model_validate(mission)
 
 
 @router.post("/text", response_model=MissionResponse)
@@ -114,71 +141,75 @@ async def submit_text(
         source_label=request.source_label
     )
     
-    return MissionResponse(
-        mission_id=str(mission.mission_id),
-        source_type=mission.source_type,
-        filename=mission.filename,
-        source_label=mission.source_label,
-        status=mission.status,
-        ingestion_timestamp=mission.ingestion_timestamp,
-        metadata=mission.mission_metadata or {},
-        error_message=mission.error_message
-    )
+    return MissionResponse.model_validate(mission)
 
 
 @router.get("", response_model=MissionListResponse)
 async def list_missions(
     limit: int = 100,
     offset: int = 0,
+    before: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ):
     """
-    Get all missions with pagination.
+    Get all missions with pagination, newest first.
+    
+    Prefer the keyset cursor: pass the previous page's next_cursor as
+    `before`. offset is still accepted but gets slower with depth.
     """
-    missions = await get_all_missions(session, limit=limit, offset=offset)
+    try:
+        cursor = decode_mission_cursor(before) if before else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    
+    missions, total = await get_all_missions(session, limit=limit, offset=offset, before=cursor)
     
     return MissionListResponse(
-        missions=[
-            MissionResponse(
-                mission_id=str(m.mission_id),
-                source_type=m.source_type,
-                filename=m.filename,
-                source_label=m.source_label,
-                status=m.status,
-                ingestion_timestamp=m.ingestion_timestamp,
-                metadata=m.mission_metadata or {},
-                error_message=m.error_message
-            )
-            for m in missions
-        ],
-        total=len(missions)
+        missions=[MissionResponse.model_validate(row) for row in missions],
+        total=total,
+        next_cursor=encode_mission_cursor(missions[-1]) if missions and len(missions) == limit else None
     )
 
 
 @router.get("/{mission_id}", response_model=MissionDetailResponse)
 async def get_mission_detail(
     mission_id: str,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """
-    Get a specific mission by ID with full content.
+    Get a specific mission by ID with a preview of its content.
+    
+    normalized_content is cut to mission_content_preview_chars; when
+    content_truncated is set the full text is at /{mission_id}/content.
+    Honors If-None-Match, so unchanged content isn't re-sent.
     """
-    mission = await get_mission(session, mission_id)
+    mission = await get_mission_preview(session, mission_id, settings.mission_content_preview_chars)
     
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
     
-    return MissionDetailResponse(
-        mission_id=str(mission.mission_id),
-        source_type=mission.source_type,
-        filename=mission.filename,
-        source_label=mission.source_label,
-        status=mission.status,
-        ingestion_timestamp=mission.ingestion_timestamp,
-        metadata=mission.mission_metadata or {},
-        error_message=mission.error_message,
-        normalized_content=mission.normalized_content
-    )
+    return etag_response(request, MissionDetailResponse.model_validate(mission))
+
+
+@router.get("/{mission_id}/content")
+async def get_mission_content_endpoint(
+    mission_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Stream a mission's full normalized content as plain text.
+    """
+    content = await get_mission_content(session, mission_id)
+    
+    if content is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    
+    def iter_chunks():
+        for start in range(0, len(content), CONTENT_CHUNK_CHARS):
+            yield content[start:start + CONTENT_CHUNK_CHARS].encode()
+    
+    return StreamingResponse(iter_chunks(), media_type="text/plain; charset=utf-8")
 
 
 @router.delete("/{mission_id}")
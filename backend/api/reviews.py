@@ -1,16 +1,25 @@
 """
 Reviews API - endpoints for analyst review workflow.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
+from api.etag import etag_response
 from db import get_session
+from models.mission import Mission
 from models.review import AnalystReview
-from services import get_mission
+
+# Dialect-specific INSERT constructs that support ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
 
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
@@ -21,14 +30,13 @@ class ReviewRequest(BaseModel):
 
 
 class ReviewResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     review_id: str
     mission_id: str
     analyst_notes: Optional[str]
     approved: bool
     reviewed_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 
 @router.post("/{mission_id}", response_model=ReviewResponse)
@@ -44,51 +52,82 @@ async def submit_review(
     - Add notes to the analysis
     - Approve or reject AI-generated results
     """
-    # Verify mission exists
-    mission = await get_mission(session, mission_id)
-    if not mission:
+    insert = UPSERT_INSERTS.get(session.bind.dialect.name)
+    if insert is not None:
+        review = await _upsert_review(session, insert, mission_id, request)
+    else:
+        review = await _write_review(session, mission_id, request)
+    
+    if review is None:
         raise HTTPException(status_code=404, detail="Mission not found")
     
-    # Check for existing review
-    result = await session.execute(
-        select(AnalystReview).where(AnalystReview.mission_id == mission_id)
+    return ReviewResponse.model_validate(review)
+
+
+async def _upsert_review(session: AsyncSession, insert, mission_id: str, request: ReviewRequest):
+    """Create or update the review in one statement; None if the mission doesn't exist."""
+    # INSERT ... SELECT from missions (no row, and so nothing returned, when
+    # the mission doesn't exist) ... ON CONFLICT on the unique mission_id
+    # DO UPDATE ... RETURNING
+    reviews = AnalystReview.__table__
+    stmt = insert(reviews).from_select(
+        ["mission_id", "analyst_notes", "approved"],
+        select(
+            Mission.mission_id,
+            literal(request.analyst_notes, reviews.c.analyst_notes.type),
+            literal(request.approved, reviews.c.approved.type)
+        ).where(Mission.mission_id == mission_id)
     )
-    existing_review = result.scalar_one_or_none()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[reviews.c.mission_id],
+        set_={
+            "analyst_notes": stmt.excluded.analyst_notes,
+            "approved": stmt.excluded.approved,
+            "reviewed_at": stmt.excluded.reviewed_at,
+        }
+    ).returning(*reviews.c)
     
-    if existing_review:
-        # Update existing review
-        existing_review.analyst_notes = request.analyst_notes
-        existing_review.approved = request.approved
-        existing_review.reviewed_at = datetime.utcnow()
-        review = existing_review
-    else:
-        # Create new review
-        review = AnalystReview(
-            mission_id=mission_id,
-            analyst_notes=request.analyst_notes,
-            approved=request.approved
-        )
+    review = (await session.execute(stmt)).one_or_none()
+    await session.commit()
+    return review
+
+
+async def _write_review(session: AsyncSession, mission_id: str, request: ReviewRequest):
+    """
+    Create or update the review with SELECT then INSERT/UPDATE.
+    
+    Used for dialects without an ON CONFLICT insert in UPSERT_INSERTS.
+    """
+    exists = await session.scalar(select(Mission.mission_id).where(Mission.mission_id == mission_id))
+    if exists is None:
+        return None
+    
+    review = await session.scalar(
+        select(AnalystReview).where(AnalystReview.mission_id == mission_id)
+    )
+    if review is None:
+        review = AnalystReview(mission_id=mission_id)
         session.add(review)
+    else:
+        review.reviewed_at = datetime.now(timezone.utc)
+    review.analyst_notes = request.analyst_notes
+    review.approved = request.approved
     
     await session.commit()
     await session.refresh(review)
-    
-    return ReviewResponse(
-        review_id=str(review.review_id),
-        mission_id=str(review.mission_id),
-        analyst_notes=review.analyst_notes,
-        approved=review.approved,
-        reviewed_at=review.reviewed_at
-    )
+    return review
 
 
 @router.get("/{mission_id}", response_model=ReviewResponse)
 async def get_review(
     mission_id: str,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Get the analyst review for a mission.
+    
+    Honors If-None-Match, so an unchanged review isn't re-sent.
     """
     result = await session.execute(
         select(AnalystReview).where(AnalystReview.mission_id == mission_id)
@@ -101,10 +140,4 @@ async def get_review(
             detail="No review found for this mission"
         )
     
-    return ReviewResponse(
-        review_id=str(review.review_id),
-        mission_id=str(review.mission_id),
-        analyst_notes=review.analyst_notes,
-        approved=review.approved,
-        reviewed_at=review.reviewed_at
-    )
+    return etag_response(request, ReviewResponse.model_validate(review))
@@ -2,36 +2,121 @@
 Configuration management using pydantic-settings.
 All configuration is loaded from environment variables.
 """
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+    
     # Database - defaults to SQLite for easy local development
     # Set DATABASE_URL to PostgreSQL connection string for production
     database_url: str = "sqlite+aiosqlite:///./mission_copilot.db"
     
+    # Connection pool (ignored for in-memory SQLite, which shares one connection)
+    db_pool_size: int = 20
+    db_max_overflow: int = 30
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    
+    # Test each connection with a round trip on checkout; pool_recycle
+    # already retires idle connections, so this mainly covers DB restarts
+    db_pool_pre_ping: bool = True
+    
+    # Connections opened at startup so the first requests skip connect latency
+    # (capped at db_pool_size, which is what the pool keeps; 0 disables)
+    db_pool_warmup: int = 20
+    
     # Hugging Face
     huggingface_api_key: str = ""
     huggingface_model: str = "mistralai/Mistral-7B-Instruct-v0.2"
     
+    # LLM response cache (exact-match, in-process LRU; 0 disables)
+    llm_cache_size: int = 512
+    
+    # Semantic LLM cache - reuse responses for near-duplicate prompts
+    # (cosine similarity of prompt embeddings >= threshold)
+    llm_semantic_cache_enabled: bool = False
+    llm_semantic_cache_threshold: float = 0.95
+    
+    # Persistent LLM cache shared across workers/restarts (empty disables)
+    llm_disk_cache_dir: str = ""
+    llm_disk_cache_ttl: int = 86400
+    
+    # LLM micro-batching - coalesce concurrent requests (0 ms disables)
+    llm_batch_window_ms: float = 5.0
+    llm_batch_max_size: int = 8
+    
+    # Characters of normalized content in the mission detail response; the
+    # full text streams from /api/missions/{id}/content (0 = no limit)
+    mission_content_preview_chars: int = 4096
+    
+    # Processes for PDF/CSV parsing (0 parses on a worker thread instead)
+    parse_workers: int = 2
+    
+    # Reuse the latest analysis of identical normalized content instead of
+    # calling the LLM again
+    analysis_result_cache: bool = True
+    
+    # Classify risk from unambiguous keywords without calling the LLM
+    risk_keyword_shortcut: bool = True
+    
+    # Template the explanation for low-risk, low-entity results (no LLM call)
+    template_low_risk_explanations: bool = True
+    
     # Embedding Model
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     
+    # Embedding runtime - "onnx" (ONNX Runtime, falls back to torch when
+    # optimum is not installed) or "torch" (SentenceTransformer)
+    embedding_backend: str = "onnx"
+    embedding_onnx_quantize: bool = False
+    
+    # torch intra-op threads for SentenceTransformer (0 = CPU count - 1)
+    embedding_num_threads: int = 0
+    
+    # Run the SentenceTransformer model in float16 (GPU only)
+    embedding_fp16: bool = False
+    
+    # RAG vector index - exact "flat" search, or switch to an approximate
+    # "hnsw"/"ivf" or quantized "sq8"/"ivfpq" index once the corpus
+    # reaches rag_ann_threshold chunks; "fp16" is exact search over
+    # half-precision vectors from the start
+    rag_index_type: str = "hnsw"
+    rag_ann_threshold: int = 10000
+    
+    # Persist the RAG index and chunk metadata under backend/faiss_index,
+    # written at most every rag_persist_interval seconds and on shutdown
+    rag_persist_index: bool = False
+    rag_persist_interval: float = 30.0
+    
+    # Move the RAG index to GPU (when faiss-gpu sees one) past this many chunks
+    rag_gpu_min_chunks: int = 50000
+    
+    # Embeddings cached by content hash (entries; 0 disables)
+    rag_embedding_cache_size: int = 10000
+    
+    # Reuse retrieval results for paraphrased queries
+    # (cosine similarity to a cached query centroid >= threshold; 0 entries disables)
+    rag_query_cache_size: int = 256
+    rag_query_cache_threshold: float = 0.86
+    
+    # Cache dashboard analytics responses (seconds; 0 disables)
+    analytics_cache_ttl: float = 30.0
+    
     # Application
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
+    
+    # Worker processes for `python main.py` (1 = single process with auto-reload)
+    backend_workers: int = 1
     frontend_url: str = "http://localhost:5173"
     
     # Cost Transparency (Hugging Face free tier = $0)
     input_cost_per_1k: float = 0.0
     output_cost_per_1k: float = 0.0
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
 
 
 @lru_cache()
@@ -1,3 +1,11 @@
 """Database package."""
-from db.database import Base, engine, async_session_maker, get_session
+from db.database import (
+    Base,
+    get_engine,
+    get_session_maker,
+    dispose_engine,
+    get_session,
+    get_session_factory,
+    warm_pool
+)
 from db.init_db import init_db, drop_db
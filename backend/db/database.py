@@ -1,25 +1,65 @@
 """
 SQLAlchemy async database configuration.
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import logging
+from functools import lru_cache
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    pool_pre_ping=True,
-)
 
-# Session factory
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+def _pool_options(database_url: str) -> dict:
+    """Engine pool arguments for the configured database."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Every connection to :memory: is a separate database
+        return {"poolclass": StaticPool}
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    """Get the process-wide async engine, created on first use."""
+    return create_async_engine(
+        settings.database_url,
+        echo=False,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        **_pool_options(settings.database_url),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_session_maker() -> async_sessionmaker:
+    """Get the session factory bound to get_engine()."""
+    return async_sessionmaker(
+        get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections and drop the engine (shutdown / reload reset hook)."""
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+    get_session_maker.cache_clear()
+    get_engine.cache_clear()
+
 
 # Base class for models
 Base = declarative_base()
@@ -27,8 +67,30 @@ Base = declarative_base()
 
 async def get_session() -> AsyncSession:
     """Dependency for getting database session."""
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Dependency for endpoints that open their own short-lived sessions."""
+    return get_session_maker()
+
+
+async def warm_pool() -> None:
+    """Open db_pool_warmup connections concurrently and return them to the pool."""
+    engine = get_engine()
+    if not isinstance(engine.pool, AsyncAdaptedQueuePool):
+        return
+    count = min(settings.db_pool_warmup, settings.db_pool_size)
+    if count <= 0:
+        return
+    
+    async def _connect():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(_connect() for _ in range(count)))
+    logger.info(f"Warmed database pool with {count} connections")
@@ -1,16 +1,76 @@
 """
 Database initialization utilities.
 """
-from db.database import engine, Base
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+from db.database import get_engine, Base
+
+# Expression indexes PostgreSQL uses for the date-bucketed trend queries
+POSTGRES_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_analysis_created_date ON analysis_results ((date(created_at)))",
+    "CREATE INDEX IF NOT EXISTS idx_missions_ingest_date ON missions ((date(ingestion_timestamp)))",
+]
+
+
+def _add_missing_columns(sync_conn):
+    """Add nullable model columns to tables that predate them (create_all skips existing tables)."""
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+            )
+
+
+def _create_missing_indexes(sync_conn):
+    """Create model indexes on tables that predate them (create_all skips existing tables)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            sync_conn.execute(CreateIndex(index, if_not_exists=True))
+    
+    if sync_conn.dialect.name == "postgresql":
+        for statement in POSTGRES_INDEXES:
+            sync_conn.exec_driver_sql(statement)
+
+
+def _dedupe_reviews(sync_conn):
+    """Keep only the latest review per mission so the unique index can be built."""
+    sync_conn.exec_driver_sql(
+        "DELETE FROM analyst_reviews WHERE EXISTS ("
+        "SELECT 1 FROM analyst_reviews newer "
+        "WHERE newer.mission_id = analyst_reviews.mission_id "
+        "AND (newer.reviewed_at > analyst_reviews.reviewed_at "
+        "OR (newer.reviewed_at = analyst_reviews.reviewed_at "
+        "AND newer.review_id > analyst_reviews.review_id)))"
+    )
+
+
+def _normalize_risk_levels(sync_conn):
+    """Store risk levels lower-case so equality filters can use the index."""
+    sync_conn.exec_driver_sql(
+        "UPDATE analysis_results SET risk_level = lower(risk_level) "
+        "WHERE risk_level <> lower(risk_level)"
+    )
 
 
 async def init_db():
-    """Initialize database tables."""
-    async with engine.begin() as conn:
+    """Initialize database tables and indexes."""
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_dedupe_reviews)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.run_sync(_normalize_risk_levels)
 
 
 async def drop_db():
     """Drop all database tables (use with caution)."""
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
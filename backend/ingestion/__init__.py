@@ -3,3 +3,4 @@ from ingestion.pdf_parser import parse_pdf
 from ingestion.csv_parser import parse_csv
 from ingestion.text_parser import parse_text
 from ingestion.normalizer import normalize_content
+from ingestion.parse_pool import run_parser, shutdown_parse_pool
@@ -1,10 +1,21 @@
 """
 Normalizer - converts all input formats to a shared internal schema.
 """
+import re
 from typing import Dict, Any
 from datetime import datetime
 from models.mission import SourceType
 
+_WORD = re.compile(r'\S+')
+
+
+def _word_count(text: str, metadata: Dict[str, Any]) -> int:
+    """Word count, reusing the parser's when it already counted the same text."""
+    if "word_count" in metadata:
+        return metadata["word_count"]
+    # Counts matches without materializing split()'s word list
+    return sum(1 for _ in _WORD.finditer(text))
+
 
 def normalize_content(
     parsed_data: Dict[str, Any],
@@ -26,20 +37,23 @@ def normalize_content(
     Returns:
         Normalized content dictionary
     """
+    text = parsed_data.get("text") or ""
+    metadata = parsed_data.get("metadata", {})
     normalized = {
         "source_type": source_type.value,
         "source_identifier": filename or source_label or "unknown",
-        "content": parsed_data.get("text", ""),
-        "content_length": len(parsed_data.get("text", "")),
-        "word_count": len(parsed_data.get("text", "").split()),
-        "metadata": parsed_data.get("metadata", {}),
+        "content": text,
+        "content_length": len(text),
+        "word_count": _word_count(text, metadata),
+        "metadata": metadata,
         "errors": parsed_data.get("errors", []),
         "normalized_at": datetime.utcnow().isoformat(),
         "is_valid": True
     }
     
     # Mark as invalid if there are critical errors or no content
-    if not normalized["content"].strip():
+    # (isspace() checks without allocating a stripped copy)
+    if not text or text.isspace():
         normalized["is_valid"] = False
         if "No content extracted" not in str(normalized["errors"]):
             normalized["errors"].append("No content extracted")
@@ -0,0 +1,90 @@
+"""
+Off-loop execution for CPU-bound document parsers.
+
+pypdf extraction and CSV parsing are pure-Python CPU work; run on the
+event loop they stall every other request. Parsers run in a process
+pool (parse_workers > 0) or, with parse_workers = 0, on a worker thread.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Optional, Union
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Copy size when spooling an upload to a named file for a worker process
+COPY_CHUNK_SIZE = 1 << 20
+
+Parser = Callable[..., Dict[str, Any]]
+
+# Global pool instance
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Get or create the parser process pool (None when disabled)."""
+    global _parse_pool
+    if _parse_pool is None and settings.parse_workers > 0:
+        # spawn, not fork: the parent has live DB/model threads
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=settings.parse_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started parser pool with {settings.parse_workers} processes")
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the parser worker processes (app shutdown)."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+
+
+def _parse_path(parser: Parser, path: str, filename: str) -> Dict[str, Any]:
+    """Worker-side entry point: parse a file by path."""
+    with open(path, "rb") as f:
+        return parser(f, filename)
+
+
+def _spool_to_named_file(file_content: BinaryIO, suffix: str) -> str:
+    """Copy a file object to a named temp file in bounded chunks; returns the path."""
+    file_content.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(file_content, tmp, COPY_CHUNK_SIZE)
+    return tmp.name
+
+
+async def run_parser(
+    parser: Parser,
+    file_content: Union[bytes, BinaryIO],
+    filename: str
+) -> Dict[str, Any]:
+    """
+    Run parser(file_content, filename) off the event loop.
+    
+    Bytes are sent to the pool as-is. File objects can't be pickled, so
+    they are spooled to a named temp file that the worker opens.
+    """
+    pool = get_parse_pool()
+    if pool is None:
+        return await asyncio.to_thread(parser, file_content, filename)
+    
+    loop = asyncio.get_running_loop()
+    if isinstance(file_content, bytes):
+        return await loop.run_in_executor(pool, parser, file_content, filename)
+    
+    path = await asyncio.to_thread(_spool_to_named_file, file_content, os.path.splitext(filename)[1])
+    try:
+        return await loop.run_in_executor(pool, _parse_path, parser, path, filename)
+    finally:
+        os.unlink(path)
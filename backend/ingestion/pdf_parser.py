@@ -3,18 +3,18 @@ PDF parser - extracts text and metadata from PDF files.
 """
 from pypdf import PdfReader
 from io import BytesIO
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def parse_pdf(file_content: bytes, filename: str = "unknown.pdf") -> Dict[str, Any]:
+def parse_pdf(file_content: Union[bytes, BinaryIO], filename: str = "unknown.pdf") -> Dict[str, Any]:
     """
     Extract text and metadata from a PDF file.
     
     Args:
-        file_content: Raw bytes of the PDF file
+        file_content: Raw bytes or a seekable binary file object (read in place)
         filename: Original filename for logging
         
     Returns:
@@ -28,7 +28,7 @@ def parse_pdf(file_content: bytes, filename: str = "unknown.pdf") -> Dict[str, A
     }
     
     try:
-        pdf_file = BytesIO(file_content)
+        pdf_file = BytesIO(file_content) if isinstance(file_content, bytes) else file_content
         reader = PdfReader(pdf_file)
         
         # Extract metadata
@@ -7,6 +7,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Whitespace normalization, compiled once
+_MULTI_NEWLINE = re.compile(r'\n{3,}')
+_SPACE_RUN = re.compile(r' {2,}')
+_TABS_TO_SPACES = str.maketrans('\t', ' ')
+
 
 def parse_text(content: str, source_label: str = "text_input") -> Dict[str, Any]:
     """
@@ -30,8 +35,12 @@ def parse_text(content: str, source_label: str = "text_input") -> Dict[str, Any]
         cleaned = content.strip()
         
         # Normalize whitespace
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)  # Max 2 newlines
-        cleaned = re.sub(r'[ \t]+', ' ', cleaned)  # Normalize spaces
+        # (substring checks skip the regex pass for already-clean text)
+        if '\n\n\n' in cleaned:
+            cleaned = _MULTI_NEWLINE.sub('\n\n', cleaned)  # Max 2 newlines
+        cleaned = cleaned.translate(_TABS_TO_SPACES)
+        if '  ' in cleaned:
+            cleaned = _SPACE_RUN.sub(' ', cleaned)  # Normalize spaces
         
         # Calculate basic stats
         word_count = len(cleaned.split())
@@ -4,12 +4,13 @@ CACI Mission Intake and Analysis Copilot - FastAPI Backend
 A lightweight, AI-enabled accelerator for mission document analysis.
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 
 from config import get_settings
-from db import init_db
+from db import init_db, warm_pool, dispose_engine
 from api import missions_router, analysis_router, reviews_router, analytics_router
 
 # Configure logging
@@ -28,12 +29,20 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Initializing database...")
     await init_db()
+    await warm_pool()
     logger.info("Database initialized successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    from ai.llm_client import close_llm_client
+    from ai.rag_service import get_rag_service
+    from ingestion import shutdown_parse_pool
+    await close_llm_client()
+    get_rag_service().persist()
+    shutdown_parse_pool()
+    await dispose_engine()
 
 
 # Create FastAPI application
@@ -53,7 +62,8 @@ app = FastAPI(
     accelerator designed to demonstrate rapid time-to-value with AI-assisted analysis.
     """,
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -100,6 +110,15 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (LLM call latency and cache-tier hit counts)."""
+    from ai.metrics import render_metrics
+    
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/api/ai/status")
 async def ai_status():
     """
@@ -123,9 +142,13 @@ async def ai_status():
 
 if __name__ == "__main__":
     import uvicorn
+    # loop/http "auto" pick uvloop and httptools (uvicorn[standard]) where available
     uvicorn.run(
         "main:app",
         host=settings.backend_host,
         port=settings.backend_port,
-        reload=True
+        reload=settings.backend_workers <= 1,
+        workers=settings.backend_workers,
+        loop="auto",
+        http="auto"
     )
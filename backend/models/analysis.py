@@ -2,7 +2,8 @@
 Analysis result model - stores AI analysis outputs.
 """
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, DateTime, Text, JSON, Integer, Float, ForeignKey
+from sqlalchemy import Boolean, Column, String, DateTime, Text, JSON, Integer, Float, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import uuid
 import enum
@@ -26,6 +27,13 @@ class AnalysisResult(Base):
     classifications, and cost transparency data.
     """
     __tablename__ = "analysis_results"
+    __table_args__ = (
+        Index("idx_analysis_risk_created", "risk_level", "created_at"),
+        # Latest-analysis lookups: WHERE mission_id = ? ORDER BY created_at DESC
+        Index("idx_analysis_mission_created", "mission_id", "created_at"),
+        # Reusing a prior result for identical content
+        Index("idx_analysis_content_hash_created", "content_hash", "created_at"),
+    )
     
     # Use String for UUID to ensure SQLite compatibility
     analysis_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -33,7 +41,8 @@ class AnalysisResult(Base):
     
     # AI-generated content
     summary_text = Column(Text, nullable=True)
-    extracted_entities = Column(JSON, default=list)
+    # JSONB on PostgreSQL, default set by the database
+    extracted_entities = Column(JSON().with_variant(JSONB(), "postgresql"), server_default=text("'[]'"))
     risk_level = Column(String(20), nullable=True)
     explanation = Column(Text, nullable=True)
     
@@ -45,6 +54,15 @@ class AnalysisResult(Base):
     output_tokens = Column(Integer, default=0)
     total_tokens = Column(Integer, default=0)
     estimated_cost = Column(Float, default=0.0)
+    # Tokens of the earlier analysis this result was copied from (0 = fresh LLM call)
+    cached_tokens = Column(Integer, default=0)
+    
+    # sha256 hex of the analyzed normalized content; only set on results
+    # that are safe to reuse (every LLM call succeeded)
+    content_hash = Column(String(64), nullable=True)
+    
+    # Whether RAG context was included in the prompts
+    used_rag = Column(Boolean, nullable=True)
     
     # Confidence indicator (heuristic-based)
     confidence_score = Column(Float, nullable=True)
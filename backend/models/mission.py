@@ -2,7 +2,8 @@
 Mission model - stores ingested mission records.
 """
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, DateTime, Text, JSON
+from sqlalchemy import Column, String, DateTime, Text, JSON, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import uuid
 import enum
@@ -33,6 +34,11 @@ class Mission(Base):
     Stores metadata about ingested mission inputs (PDFs, CSVs, text).
     """
     __tablename__ = "missions"
+    __table_args__ = (
+        Index("idx_missions_ingest_ts", "ingestion_timestamp"),
+        # Status-filtered listings in ingestion order
+        Index("idx_missions_status_ingest_ts", "status", "ingestion_timestamp"),
+    )
     
     # Use String for UUID to ensure SQLite compatibility
     mission_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -43,7 +49,8 @@ class Mission(Base):
     normalized_content = Column(Text, nullable=True)
     ingestion_timestamp = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     status = Column(String(20), default="pending")
-    mission_metadata = Column(JSON, default=dict)  # Renamed to avoid SQLAlchemy reserved name
+    # Renamed to avoid SQLAlchemy reserved name; JSONB on PostgreSQL, default set by the database
+    mission_metadata = Column(JSON().with_variant(JSONB(), "postgresql"), server_default=text("'{}'"))
     error_message = Column(Text, nullable=True)
     
     # Relationships
@@ -52,3 +59,7 @@ class Mission(Base):
     
     def __repr__(self):
         return f"<Mission {self.mission_id} - {self.source_type}>"
+
+
+# Analytics filters and groups on lower(status)
+Index("idx_missions_status_lower", func.lower(Mission.status))
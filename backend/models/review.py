@@ -2,7 +2,7 @@
 Analyst review model - stores human-in-the-loop feedback.
 """
 from datetime import datetime, timezone
-from sqlalchemy import Column, Boolean, DateTime, Text, String, ForeignKey
+from sqlalchemy import Column, Boolean, DateTime, Text, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -17,6 +17,10 @@ class AnalystReview(Base):
     to add notes and approve/reject AI-generated analysis.
     """
     __tablename__ = "analyst_reviews"
+    __table_args__ = (
+        # One review per mission; also the conflict target for review upserts
+        Index("uq_analyst_reviews_mission", "mission_id", unique=True),
+    )
     
     # Use String for UUID to ensure SQLite compatibility
     review_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -3,7 +3,11 @@ from services.mission_service import (
     create_mission_from_file,
     create_mission_from_text,
     get_mission,
+    get_mission_preview,
+    get_mission_content,
     get_all_missions,
+    encode_mission_cursor,
+    decode_mission_cursor,
     update_mission_status,
     delete_mission
 )
@@ -12,3 +16,4 @@ from services.analysis_service import (
     get_analysis_result,
     get_all_analysis_results
 )
+from services.analytics_cache import analytics_cache, invalidate_analytics_cache
@@ -1,16 +1,85 @@
 """
 Analysis service - orchestrates AI analysis workflow.
 """
-from typing import Optional
-from sqlalchemy import select
+import hashlib
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ai import analyzer
+from config import get_settings
 from models.mission import Mission, MissionStatus
 from models.analysis import AnalysisResult, RiskLevel
-from services.mission_service import get_mission, update_mission_status
+from services.mission_service import get_mission
+from services.analytics_cache import invalidate_analytics_cache
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Mission attributes run_analysis reads or writes (raw_content is never loaded)
+ANALYSIS_MISSION_COLUMNS = (
+    Mission.mission_id,
+    Mission.normalized_content,
+    Mission.status,
+    Mission.error_message,
+)
+
+
+def content_hash(content: str) -> str:
+    """sha256 hex digest identifying analyzed content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+async def find_cached_analysis(
+    session: AsyncSession,
+    digest: str,
+    mission_id: str,
+    model: str,
+    used_rag: bool
+) -> Optional[AnalysisResult]:
+    """
+    Latest reusable analysis of content with the given hash, if any.
+    
+    Only results another mission got from the same model and RAG mode
+    with tokens actually spent qualify; a mission's own rows are skipped
+    so an explicit re-analysis always reaches the LLM.
+    """
+    result = await session.execute(
+        select(AnalysisResult)
+        .where(
+            AnalysisResult.content_hash == digest,
+            AnalysisResult.mission_id != mission_id,
+            AnalysisResult.llm_model_used == model,
+            AnalysisResult.used_rag == used_rag,
+            AnalysisResult.total_tokens > 0
+        )
+        .order_by(AnalysisResult.created_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _copy_analysis(source: AnalysisResult, mission_id: str, digest: str) -> Dict[str, Any]:
+    """Result values for a mission reusing an earlier analysis (no tokens spent)."""
+    return dict(
+        mission_id=mission_id,
+        summary_text=source.summary_text,
+        extracted_entities=source.extracted_entities,
+        risk_level=source.risk_level,
+        explanation=source.explanation,
+        llm_model_used=source.llm_model_used,
+        input_tokens=0,
+        output_tokens=0,
+        total_tokens=0,
+        estimated_cost=0.0,
+        cached_tokens=source.total_tokens or source.cached_tokens or 0,
+        confidence_score=source.confidence_score,
+        processing_time_ms=0,
+        content_hash=digest,
+        used_rag=source.used_rag
+    )
 
 
 async def run_analysis(
@@ -31,7 +100,7 @@ async def run_analysis(
     Returns:
         AnalysisResult if successful, None otherwise
     """
-    mission = await get_mission(session, mission_id)
+    mission = await get_mission(session, mission_id, ANALYSIS_MISSION_COLUMNS)
     if not mission:
         logger.error(f"Mission {mission_id} not found")
         return None
@@ -40,47 +109,44 @@ async def run_analysis(
         logger.error(f"Mission {mission_id} has no content to analyze")
         return None
     
-    # Update status to analyzing
-    await update_mission_status(session, mission_id, MissionStatus.ANALYZING.value)
+    # Status changes go through the mission loaded above (no re-select per
+    # transition). ANALYZING is committed rather than just flushed so other
+    # sessions can see it and no write lock is held during the LLM call.
+    mission.status = MissionStatus.ANALYZING.value
+    await session.commit()
+    invalidate_analytics_cache()
     
     try:
-        # Import here to avoid circular imports
-        from ai.analyzer import analyze_content
-        import time
+        if llm_client is None:
+            from ai.llm_client import get_llm_client
+            llm_client = get_llm_client()
         
-        # Track processing time
-        start_time = time.time()
+        # Identical content analyzed before: copy that result, skip the LLM
+        digest = content_hash(mission.normalized_content)
+        cached = None
+        if settings.analysis_result_cache:
+            cached = await find_cached_analysis(
+                session, digest, mission_id, llm_client.model, rag_service is not None
+            )
         
-        # Run analysis
-        analysis_data = await analyze_content(
-            content=mission.normalized_content,
-            llm_client=llm_client,
-            rag_service=rag_service
-        )
-        
-        # Calculate processing time
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        if cached is not None:
+            logger.info(f"Mission {mission_id}: reusing analysis {cached.analysis_id} of identical content")
+            values = _copy_analysis(cached, mission_id, digest)
+        else:
+            values = await _analyze(mission, llm_client, rag_service, digest)
         
-        # Create analysis result
-        result = AnalysisResult(
-            mission_id=mission_id,
-            summary_text=analysis_data.get("summary", ""),
-            extracted_entities=analysis_data.get("entities", []),
-            risk_level=analysis_data.get("risk_level", "medium"),
-            explanation=analysis_data.get("explanation", ""),
-            llm_model_used=analysis_data.get("model", ""),
-            input_tokens=analysis_data.get("input_tokens", 0),
-            output_tokens=analysis_data.get("output_tokens", 0),
-            total_tokens=analysis_data.get("total_tokens", 0),
-            estimated_cost=analysis_data.get("estimated_cost", 0.0),
-            confidence_score=analysis_data.get("confidence_score", 0.75),
-            processing_time_ms=processing_time_ms
-        )
-        
-        session.add(result)
-        await update_mission_status(session, mission_id, MissionStatus.ANALYZED.value)
+        # Result and terminal status in one commit
+        result = await _insert_result(session, values)
+        mission.status = MissionStatus.ANALYZED.value
         await session.commit()
-        await session.refresh(result)
+        invalidate_analytics_cache()
+        
+        # Make this mission retrievable as context for later analyses
+        if rag_service:
+            try:
+                rag_service.index_mission(mission.normalized_content, mission_id)
+            except Exception as e:
+                logger.warning(f"RAG indexing failed for mission {mission_id}: {e}")
         
         logger.info(f"Completed analysis for mission {mission_id}")
         return result
@@ -88,19 +154,87 @@ async def run_analysis(
     except Exception as e:
         error_msg = f"Analysis failed: {str(e)}"
         logger.error(f"Mission {mission_id}: {error_msg}")
-        await update_mission_status(session, mission_id, MissionStatus.ERROR.value, error_msg)
+        # Discard a half-written result before recording the failure
+        await session.rollback()
+        mission.status = MissionStatus.ERROR.value
+        mission.error_message = error_msg
+        await session.commit()
+        invalidate_analytics_cache()
         return None
 
 
+async def _analyze(
+    mission: Mission,
+    llm_client,
+    rag_service,
+    digest: str
+) -> Dict[str, Any]:
+    """Run the LLM analysis pipeline and return the result's column values."""
+    # Track processing time
+    start_time = time.time()
+    
+    # Run analysis
+    analysis_data = await analyzer.analyze_content(
+        content=mission.normalized_content,
+        llm_client=llm_client,
+        rag_service=rag_service
+    )
+    
+    # Calculate processing time
+    processing_time_ms = int((time.time() - start_time) * 1000)
+    
+    # A result built on fallbacks must never be served to other missions
+    errors = analysis_data.get("errors")
+    if errors:
+        logger.warning(f"Mission {mission.mission_id}: not caching analysis with errors: {errors}")
+    
+    return dict(
+        mission_id=mission.mission_id,
+        summary_text=analysis_data.get("summary", ""),
+        extracted_entities=analysis_data.get("entities", []),
+        risk_level=analysis_data.get("risk_level", "medium").lower(),
+        explanation=analysis_data.get("explanation", ""),
+        llm_model_used=analysis_data.get("model", ""),
+        input_tokens=analysis_data.get("input_tokens", 0),
+        output_tokens=analysis_data.get("output_tokens", 0),
+        total_tokens=analysis_data.get("total_tokens", 0),
+        estimated_cost=analysis_data.get("estimated_cost", 0.0),
+        confidence_score=analysis_data.get("confidence_score", 0.75),
+        processing_time_ms=processing_time_ms,
+        content_hash=None if errors else digest,
+        used_rag=rag_service is not None
+    )
+
+
+async def _insert_result(session: AsyncSession, values: Dict[str, Any]) -> AnalysisResult:
+    """
+    Insert an analysis result and return it as a session object.
+    
+    Uses INSERT ... RETURNING where the dialect supports it, so the row
+    (defaults included) comes back from the same statement without the
+    unit-of-work flush; otherwise adds and flushes the object.
+    """
+    if session.get_bind().dialect.insert_returning:
+        return await session.scalar(
+            insert(AnalysisResult).values(**values).returning(AnalysisResult)
+        )
+    result = AnalysisResult(**values)
+    session.add(result)
+    await session.flush()
+    return result
+
+
 async def get_analysis_result(
     session: AsyncSession,
     mission_id: str
 ) -> Optional[AnalysisResult]:
     """Get the latest analysis result for a mission."""
+    # One-row seek on idx_analysis_mission_created (scanned backwards)
     result = await session.execute(
         select(AnalysisResult)
         .where(AnalysisResult.mission_id == mission_id)
         .order_by(AnalysisResult.created_at.desc())
+        .limit(1)
     )
     return result.scalar_one_or_none()
 
@@ -0,0 +1,58 @@
+"""
+Short-lived cache for dashboard analytics responses.
+
+The dashboard polls the summary and trend endpoints every few seconds,
+but the underlying data only changes when missions are ingested, change
+status or are deleted. Responses are cached in-process for a few seconds
+and dropped as soon as one of those writes happens.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from config import get_settings
+
+settings = get_settings()
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, maxsize: int = 64):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+analytics_cache = TTLCache(ttl=settings.analytics_cache_ttl)
+
+
+def invalidate_analytics_cache() -> None:
+    """Drop cached analytics after a write that changes them."""
+    analytics_cache.clear()
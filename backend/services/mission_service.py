@@ -1,41 +1,74 @@
 """
 Mission service - business logic for mission CRUD operations.
 """
-from typing import List, Optional
-from sqlalchemy import select
+import asyncio
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import Row, func, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 from datetime import datetime
 
 from models.mission import Mission, MissionStatus, SourceType
-from ingestion import parse_pdf, parse_csv, parse_text, normalize_content
+from models.analysis import AnalysisResult
+from models.review import AnalystReview
+from services.analytics_cache import invalidate_analytics_cache
+from ingestion import parse_pdf, parse_csv, parse_text, normalize_content, run_parser
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Mission columns for list/detail rows (everything but the content columns)
+MISSION_SUMMARY_COLUMNS = (
+    Mission.mission_id,
+    Mission.source_type,
+    Mission.filename,
+    Mission.source_label,
+    Mission.status,
+    Mission.ingestion_timestamp,
+    Mission.mission_metadata,
+    Mission.error_message,
+)
+
+
+def _parse_text_file(file_content: Union[bytes, BinaryIO], filename: str) -> dict:
+    """Decode an uploaded TXT file and parse it as text."""
+    if not isinstance(file_content, bytes):
+        file_content = file_content.read()
+    return parse_text(file_content.decode('utf-8', errors='replace'), filename)
+
+
+def _normalize_text(text_content: str, source_label: str) -> dict:
+    """Parse and normalize free text in one worker-thread hop."""
+    parsed = parse_text(text_content, source_label)
+    return normalize_content(parsed, SourceType.TEXT, source_label=source_label)
+
 
 async def create_mission_from_file(
     session: AsyncSession,
-    file_content: bytes,
+    file_content: Union[bytes, BinaryIO],
     filename: str,
     source_type: SourceType
 ) -> Mission:
     """
     Create a mission from uploaded file content.
+    
+    PDF and CSV parsers read a file object in place, so uploads can be
+    passed without buffering them into a bytes copy first. Parsing runs
+    off the event loop (PDF/CSV in the parser pool, text and
+    normalization on a worker thread).
     """
     # Parse based on source type
     if source_type == SourceType.PDF:
-        parsed = parse_pdf(file_content, filename)
+        parsed = await run_parser(parse_pdf, file_content, filename)
     elif source_type == SourceType.CSV:
-        parsed = parse_csv(file_content, filename)
+        parsed = await run_parser(parse_csv, file_content, filename)
     elif source_type == SourceType.TEXT:
-        # For TXT files, decode bytes to string and parse as text
-        text_content = file_content.decode('utf-8', errors='replace')
-        parsed = parse_text(text_content, filename)
+        parsed = await asyncio.to_thread(_parse_text_file, file_content, filename)
     else:
         raise ValueError(f"Unsupported file type: {source_type}")
     
     # Normalize content
-    normalized = normalize_content(parsed, source_type, filename=filename)
+    normalized = await asyncio.to_thread(normalize_content, parsed, source_type, filename=filename)
     
     # Create mission record
     mission = Mission(
@@ -48,9 +81,11 @@ async def create_mission_from_file(
         error_message="; ".join(normalized["errors"]) if normalized["errors"] else None
     )
     
+    # Defaults (id, timestamp) are set client-side at flush and the session
+    # doesn't expire on commit, so no refresh SELECT is needed
     session.add(mission)
     await session.commit()
-    await session.refresh(mission)
+    invalidate_analytics_cache()
     
     logger.info(f"Created mission {mission.mission_id} from {filename}")
     return mission
@@ -64,8 +99,7 @@ async def create_mission_from_text(
     """
     Create a mission from free-text input.
     """
-    parsed = parse_text(text_content, source_label)
-    normalized = normalize_content(parsed, SourceType.TEXT, source_label=source_label)
+    normalized = await asyncio.to_thread(_normalize_text, text_content, source_label)
     
     mission = Mission(
         source_type=SourceType.TEXT.value,
@@ -79,33 +113,151 @@ async def create_mission_from_text(
     
     session.add(mission)
     await session.commit()
-    await session.refresh(mission)
+    invalidate_analytics_cache()
     
     logger.info(f"Created mission {mission.mission_id} from text input")
     return mission
 
 
-async def get_mission(session: AsyncSession, mission_id: str) -> Optional[Mission]:
-    """Get a mission by ID."""
+async def get_mission(
+    session: AsyncSession,
+    mission_id: str,
+    columns: Sequence = ()
+) -> Optional[Mission]:
+    """
+    Get a mission by ID.
+    
+    Pass columns to load only those attributes (e.g. to skip raw_content);
+    the others are not loaded, so callers must not touch them.
+    """
+    stmt = select(Mission).where(Mission.mission_id == mission_id)
+    if columns:
+        stmt = stmt.options(load_only(*columns))
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_mission_preview(
+    session: AsyncSession,
+    mission_id: str,
+    max_chars: int
+) -> Optional[Row]:
+    """
+    Get a mission row with only the first max_chars of its normalized
+    content (all of it when max_chars is 0).
+    
+    The row has the summary columns plus normalized_content (the preview),
+    content_length and content_truncated. The prefix is cut in SQL, so
+    large documents aren't loaded for a detail view.
+    """
+    content_length = func.coalesce(func.length(Mission.normalized_content), 0)
+    if max_chars > 0:
+        content = func.substr(Mission.normalized_content, 1, max_chars)
+        truncated = content_length > max_chars
+    else:
+        content = Mission.normalized_content
+        truncated = literal(False)
     result = await session.execute(
-        select(Mission).where(Mission.mission_id == mission_id)
+        select(
+            *MISSION_SUMMARY_COLUMNS,
+            content.label("normalized_content"),
+            content_length.label("content_length"),
+            truncated.label("content_truncated")
+        )
+        .where(Mission.mission_id == mission_id)
     )
-    return result.scalar_one_or_none()
+    return result.one_or_none()
+
+
+async def get_mission_content(session: AsyncSession, mission_id: str) -> Optional[str]:
+    """Get just a mission's normalized content (None if the mission doesn't exist)."""
+    result = await session.execute(
+        select(Mission.normalized_content).where(Mission.mission_id == mission_id)
+    )
+    row = result.one_or_none()
+    return None if row is None else (row[0] or "")
+
+
+def encode_mission_cursor(row) -> str:
+    """Keyset cursor for the page after this (last listed) mission."""
+    return f"{row.ingestion_timestamp.isoformat()}_{row.mission_id}"
+
+
+def decode_mission_cursor(cursor: str) -> Tuple[datetime, Optional[str]]:
+    """
+    Parse a cursor into (ingestion_timestamp, mission_id).
+    
+    A bare ISO timestamp is accepted too (mission_id None). Raises
+    ValueError for anything else.
+    """
+    timestamp, _, mission_id = cursor.partition("_")
+    return datetime.fromisoformat(timestamp), mission_id or None
 
 
 async def get_all_missions(
     session: AsyncSession,
     limit: int = 100,
-    offset: int = 0
-) -> List[Mission]:
-    """Get all missions with pagination."""
+    offset: int = 0,
+    before: Optional[Tuple[datetime, Optional[str]]] = None
+) -> Tuple[List[Row], int]:
+    """
+    Get a page of mission rows with their analysis and review counts,
+    plus the total number of missions.
+    
+    Rows carry the summary columns (never the content columns) plus
+    analysis_count and review_count. Counts come from correlated
+    subqueries and the total from an uncorrelated one in the same
+    statement, so the page costs one round trip instead of one per
+    mission. Only a page past the end needs a separate COUNT.
+    
+    Pages are newest first. `before` (see decode_mission_cursor) starts
+    the page after that mission with an index seek, so deep pages cost
+    the same as the first; offset still works but scans skipped rows.
+    """
+    analysis_count = (
+        select(func.count(AnalysisResult.analysis_id))
+        .where(AnalysisResult.mission_id == Mission.mission_id)
+        .correlate(Mission)
+        .scalar_subquery()
+    )
+    review_count = (
+        select(func.count(AnalystReview.review_id))
+        .where(AnalystReview.mission_id == Mission.mission_id)
+        .correlate(Mission)
+        .scalar_subquery()
+    )
+    total_count = select(func.count()).select_from(Mission).correlate(None).scalar_subquery()
+    
+    keyset = []
+    if before is not None:
+        timestamp, mission_id = before
+        if mission_id is None:
+            keyset.append(Mission.ingestion_timestamp < timestamp)
+        else:
+            # Mission id breaks ties between equal timestamps
+            keyset.append(
+                tuple_(Mission.ingestion_timestamp, Mission.mission_id) < tuple_(timestamp, mission_id)
+            )
+    
     result = await session.execute(
-        select(Mission)
-        .order_by(Mission.ingestion_timestamp.desc())
+        select(
+            *MISSION_SUMMARY_COLUMNS,
+            analysis_count.label("analysis_count"),
+            review_count.label("review_count"),
+            total_count.label("total")
+        )
+        .where(*keyset)
+        .order_by(Mission.ingestion_timestamp.desc(), Mission.mission_id.desc())
         .limit(limit)
         .offset(offset)
     )
-    return result.scalars().all()
+    rows = result.all()
+    
+    if rows:
+        total = rows[0].total
+    else:
+        total = await session.scalar(select(func.count()).select_from(Mission))
+    return rows, total
 
 
 async def update_mission_status(
@@ -113,23 +265,45 @@ async def update_mission_status(
     mission_id: str,
     status: str,
     error_message: Optional[str] = None
-) -> Optional[Mission]:
-    """Update mission status."""
-    mission = await get_mission(session, mission_id)
-    if mission:
-        mission.status = status
-        if error_message:
-            mission.error_message = error_message
-        await session.commit()
-        await session.refresh(mission)
-    return mission
+) -> bool:
+    """
+    Update mission status with a single UPDATE (no row load).
+    
+    Returns False if the mission doesn't exist.
+    """
+    values = {"status": status}
+    if error_message:
+        values["error_message"] = error_message
+    result = await session.execute(
+        update(Mission)
+        .where(Mission.mission_id == mission_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    if not result.rowcount:
+        return False
+    invalidate_analytics_cache()
+    return True
 
 
 async def delete_mission(session: AsyncSession, mission_id: str) -> bool:
     """Delete a mission and all related records."""
-    mission = await get_mission(session, mission_id)
+    # Only keys are needed for the cascade; children come in one query per
+    # relationship rather than a lazy load each
+    result = await session.execute(
+        select(Mission)
+        .where(Mission.mission_id == mission_id)
+        .options(
+            load_only(Mission.mission_id),
+            selectinload(Mission.analysis_results).load_only(AnalysisResult.analysis_id),
+            selectinload(Mission.reviews).load_only(AnalystReview.review_id)
+        )
+    )
+    mission = result.scalar_one_or_none()
     if mission:
         await session.delete(mission)
         await session.commit()
+        invalidate_analytics_cache()
         return True
     return False
@@ -5,8 +5,9 @@ import pytest
 import asyncio
 from typing import AsyncGenerator, Generator
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import (
+    create_async_engine, AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+)
 
 # Import app and database components
 import sys
@@ -14,7 +15,8 @@ sys.path.insert(0, '.')
 
 from main import app
 from db.database import Base
-from db import get_session
+from db import get_session, get_session_factory
+from services import invalidate_analytics_cache
 
 
 # Test database URL (in-memory SQLite)
@@ -29,39 +31,88 @@ def event_loop() -> Generator:
     loop.close()
 
 
-@pytest.fixture(scope="function")
-async def test_db() -> AsyncGenerator[AsyncSession, None]:
-    """Create a fresh test database for each test."""
+@pytest.fixture(scope="session")
+async def db_engine(event_loop: asyncio.AbstractEventLoop) -> AsyncGenerator[AsyncEngine, None]:
+    """
+    Create the test database schema once per session.
+    
+    Depends on event_loop explicitly so the engine is disposed before the
+    session loop closes (otherwise teardown can hit a closed loop).
+    """
     engine = create_async_engine(TEST_DATABASE_URL, echo=False)
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
+    yield engine
+    
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def db_connection(
+    event_loop: asyncio.AbstractEventLoop,
+    db_engine: AsyncEngine
+) -> AsyncGenerator[AsyncConnection, None]:
+    """One connection inside an outer transaction that is never committed (torn down before event_loop)."""
+    async with db_engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        await transaction.rollback()
+
+
+@pytest.fixture(scope="function")
+async def test_db(db_connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for one test, isolated by a SAVEPOINT rolled back afterwards.
+    
+    Commits inside the test only release nested savepoints, so nothing
+    outlives the test and the schema is built once per run.
+    """
+    savepoint = await db_connection.begin_nested()
+    session = AsyncSession(
+        bind=db_connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
     )
     
-    async with async_session() as session:
-        yield session
+    yield session
     
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    await session.close()
+    if savepoint.is_active:
+        await savepoint.rollback()
+
+
+@pytest.fixture(scope="session")
+async def http_client(event_loop: asyncio.AbstractEventLoop) -> AsyncGenerator[AsyncClient, None]:
+    """
+    One ASGI client for the whole run.
     
-    await engine.dispose()
+    The app lifespan is not run: it would initialize the real database
+    and AI services, while tests only talk to the overridden session.
+    Depends on event_loop so the client closes before the loop does.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
 
 
 @pytest.fixture(scope="function")
-async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with overridden database dependency."""
+async def client(http_client: AsyncClient, test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+    """Shared test client with the database dependency overridden for this test."""
     
     async def override_get_session():
         yield test_db
     
+    invalidate_analytics_cache()
     app.dependency_overrides[get_session] = override_get_session
+    # Extra (read-only) sessions join the test's transaction without savepoints
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(
+        test_db.bind, class_=AsyncSession, expire_on_commit=False,
+        join_transaction_mode="rollback_only"
+    )
     
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        yield ac
+    yield http_client
     
     app.dependency_overrides.clear()
 
@@ -0,0 +1,150 @@
+"""
+Tests for the analysis workflow's database writes.
+"""
+import pytest
+
+import ai.analyzer
+from models.mission import Mission
+from services.analysis_service import run_analysis, get_analysis_result
+
+
+async def _add_mission(session, content: str = "Convoy schedule update") -> str:
+    mission = Mission(source_type="text", normalized_content=content, status="ingested")
+    session.add(mission)
+    await session.commit()
+    return mission.mission_id
+
+
+class TestRunAnalysis:
+    """Test suite for run_analysis status transitions."""
+    
+    @pytest.mark.asyncio
+    async def test_success_marks_analyzed(self, test_db, monkeypatch):
+        """Test that a completed analysis is stored with the mission marked analyzed."""
+        async def fake_analyze(content, llm_client=None, rag_service=None):
+            return {"summary": "Convoy moves", "risk_level": "LOW", "entities": []}
+        
+        monkeypatch.setattr(ai.analyzer, "analyze_content", fake_analyze)
+        mission_id = await _add_mission(test_db)
+        
+        result = await run_analysis(test_db, mission_id)
+        mission = await test_db.get(Mission, mission_id)
+        
+        assert result.summary_text == "Convoy moves"
+        assert result.risk_level == "low"
+        assert mission.status == "analyzed"
+    
+    @pytest.mark.asyncio
+    async def test_failure_records_error(self, test_db, monkeypatch):
+        """Test that a failed analysis leaves the mission in the error state."""
+        async def failing_analyze(content, llm_client=None, rag_service=None):
+            raise RuntimeError("model unavailable")
+        
+        monkeypatch.setattr(ai.analyzer, "analyze_content", failing_analyze)
+        mission_id = await _add_mission(test_db)
+        
+        assert await run_analysis(test_db, mission_id) is None
+        mission = await test_db.get(Mission, mission_id)
+        
+        assert mission.status == "error"
+        assert "model unavailable" in mission.error_message
+
+    
+    @pytest.mark.asyncio
+    async def test_identical_content_reuses_analysis(self, test_db, monkeypatch):
+        """Test that re-ingested content is answered from the earlier result without the LLM."""
+        calls = []
+        
+        async def fake_analyze(content, llm_client=None, rag_service=None):
+            calls.append(content)
+            return {
+                "summary": "Convoy moves", "risk_level": "high", "entities": [],
+                "model": llm_client.model, "total_tokens": 120
+            }
+        
+        monkeypatch.setattr(ai.analyzer, "analyze_content", fake_analyze)
+        first = await run_analysis(test_db, await _add_mission(test_db))
+        second = await run_analysis(test_db, await _add_mission(test_db))
+        await run_analysis(test_db, await _add_mission(test_db, "Different report"))
+        
+        assert calls == ["Convoy schedule update", "Different report"]
+        assert second.mission_id != first.mission_id
+        assert (second.summary_text, second.risk_level) == ("Convoy moves", "high")
+        assert (second.total_tokens, second.cached_tokens) == (0, 120)
+        
+        # Explicit re-analysis and a different RAG mode both reach the LLM
+        await run_analysis(test_db, first.mission_id)
+        await run_analysis(test_db, await _add_mission(test_db), rag_service=object())
+        assert len(calls) == 4
+    
+    @pytest.mark.asyncio
+    async def test_failed_analysis_not_reused(self, test_db, monkeypatch):
+        """Test that a result built on LLM fallbacks is not served to identical content."""
+        calls = []
+        
+        async def degraded_analyze(content, llm_client=None, rag_service=None):
+            calls.append(content)
+            return {
+                "summary": "[AI generation failed: timeout]", "risk_level": "medium", "entities": [],
+                "model": llm_client.model, "total_tokens": 80, "errors": ["Request timeout"]
+            }
+        
+        monkeypatch.setattr(ai.analyzer, "analyze_content", degraded_analyze)
+        first = await run_analysis(test_db, await _add_mission(test_db))
+        await run_analysis(test_db, await _add_mission(test_db))
+        
+        assert len(calls) == 2
+        assert first.content_hash is None
+    
+    @pytest.mark.asyncio
+    async def test_result_cache_can_be_disabled(self, test_db, monkeypatch):
+        """Test that every analysis calls the LLM when the cache is off."""
+        import services.analysis_service as analysis_service
+        calls = []
+        
+        async def fake_analyze(content, llm_client=None, rag_service=None):
+            calls.append(content)
+            return {"summary": "Convoy moves", "risk_level": "low", "entities": []}
+        
+        monkeypatch.setattr(ai.analyzer, "analyze_content", fake_analyze)
+        monkeypatch.setattr(analysis_service.settings, "analysis_result_cache", False)
+        await run_analysis(test_db, await _add_mission(test_db))
+        await run_analysis(test_db, await _add_mission(test_db))
+        
+        assert len(calls) == 2
+
+    
+    @pytest.mark.asyncio
+    async def test_latest_result_after_reanalysis(self, test_db, monkeypatch):
+        """Test that a re-analyzed mission returns its newest result."""
+        import services.analysis_service as analysis_service
+        summaries = iter(["First pass", "Second pass"])
+        
+        async def fake_analyze(content, llm_client=None, rag_service=None):
+            return {"summary": next(summaries), "risk_level": "low", "entities": []}
+        
+        monkeypatch.setattr(ai.analyzer, "analyze_content", fake_analyze)
+        monkeypatch.setattr(analysis_service.settings, "analysis_result_cache", False)
+        mission_id = await _add_mission(test_db)
+        await run_analysis(test_db, mission_id)
+        await run_analysis(test_db, mission_id)
+        
+        assert (await get_analysis_result(test_db, mission_id)).summary_text == "Second pass"
+
+
+class TestUpdateMissionStatus:
+    """Test suite for the single-statement status update."""
+    
+    @pytest.mark.asyncio
+    async def test_updates_existing_mission(self, test_db):
+        """Test that status and error are written and missing ids report False."""
+        from services import update_mission_status
+        
+        mission_id = await _add_mission(test_db)
+        
+        assert await update_mission_status(test_db, mission_id, "error", "parse failed")
+        assert not await update_mission_status(test_db, "nonexistent-id", "error")
+        
+        test_db.expire_all()
+        mission = await test_db.get(Mission, mission_id)
+        assert (mission.status, mission.error_message) == ("error", "parse failed")
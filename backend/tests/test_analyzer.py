@@ -0,0 +1,174 @@
+"""
+Tests for the AI analyzer orchestration (no network calls).
+"""
+import asyncio
+import pytest
+
+from ai.analyzer import analyze_content, _calculate_confidence, _match_risk_keywords, _parse_entities
+
+
+class FakeLLMClient:
+    """Stand-in for HuggingFaceLLMClient that returns canned responses."""
+
+    model = "fake-model"
+
+    def __init__(self, responses: dict = None, delay: float = 0.0, fail_on: str = None):
+        self.responses = responses or {}
+        self.delay = delay
+        self.fail_on = fail_on
+        self.prompts = []
+
+    async def generate(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7, **kwargs) -> dict:
+        self.prompts.append(prompt)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("simulated failure")
+
+        text = "Generic response text."
+        for marker, response in self.responses.items():
+            if marker in prompt:
+                text = response
+                break
+        return {"text": text, "input_tokens": 10, "output_tokens": 5}
+
+
+SAMPLE_CONTENT = (
+    "Operation Phoenix requires coordination between the cyber team and "
+    "logistics. The deadline is tight and the network shows increased activity."
+)
+
+
+class TestAnalyzeContent:
+    """Test suite for analyze_content."""
+
+    @pytest.mark.asyncio
+    async def test_analysis_result_shape(self):
+        """Test that the analyzer returns all expected fields."""
+        client = FakeLLMClient(responses={
+            "JSON array": '[{"name": "Phoenix", "type": "SYSTEM", "relevance": "high"}]',
+            "exactly one word": "HIGH",
+        })
+        result = await analyze_content(SAMPLE_CONTENT, llm_client=client)
+
+        assert result["summary"].startswith("[AI-Generated]")
+        assert result["entities"][0]["name"] == "Phoenix"
+        assert result["risk_level"] == "high"
+        assert result["model"] == "fake-model"
+        assert result["total_tokens"] == result["input_tokens"] + result["output_tokens"]
+
+    @pytest.mark.asyncio
+    async def test_summary_and_entities_run_concurrently(self):
+        """Test that independent LLM calls overlap instead of running serially."""
+        client = FakeLLMClient(delay=0.1)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await analyze_content(SAMPLE_CONTENT, llm_client=client)
+        elapsed = loop.time() - start
+
+        # Four serial calls would take >= 0.4s; the concurrent pair saves one delay
+        assert elapsed < 0.38
+
+    @pytest.mark.asyncio
+    async def test_failed_subtask_falls_back(self):
+        """Test that one failing sub-task does not abort the whole analysis."""
+        client = FakeLLMClient(fail_on="JSON array")
+        result = await analyze_content(SAMPLE_CONTENT, llm_client=client)
+
+        assert result["entities"] == []
+        assert result["summary"].startswith("[AI-Generated]")
+        assert result["explanation"].startswith("[AI-Generated]")
+
+
+class TestConfidence:
+    """Test suite for the heuristic confidence score."""
+
+    def test_minimum_score(self):
+        """Test the base score for minimal inputs."""
+        assert _calculate_confidence("", [], "short") == 0.5
+
+    def test_partial_score(self):
+        """Test that each satisfied threshold adds to the score."""
+        assert _calculate_confidence("x" * 60, [{"name": "a"}], "y" * 600) == 0.8
+
+    def test_score_is_capped(self):
+        """Test that confidence never exceeds 0.95."""
+        assert _calculate_confidence("x" * 200, [{}] * 5, "y" * 3000) == 0.95
+
+
+class TestParseEntities:
+    """Test suite for entity response parsing."""
+
+    def test_parses_array_surrounded_by_prose(self):
+        """Test extraction of a JSON array embedded in model chatter."""
+        text = 'Here you go:\n[{"name": "APT Alpha", "type": "ORGANIZATION"}]\nDone.'
+        entities = _parse_entities(text)
+
+        assert entities == [{"name": "APT Alpha", "type": "ORGANIZATION", "relevance": "medium"}]
+
+    def test_skips_invalid_items(self):
+        """Test that items without a name are dropped."""
+        entities = _parse_entities('[{"type": "RISK"}, "text", {"name": "Phoenix"}]')
+
+        assert [e["name"] for e in entities] == ["Phoenix"]
+
+    def test_malformed_json_falls_back(self):
+        """Test the placeholder entity for unparseable output."""
+        entities = _parse_entities("[not json]")
+
+        assert entities[0]["name"] == "Analysis pending"
+
+
+class TestRiskKeywordShortcut:
+    """Test suite for keyword-based risk classification."""
+
+    @pytest.mark.asyncio
+    async def test_unambiguous_keyword_skips_llm(self):
+        """Test that a critical phrase is classified without a risk prompt."""
+        client = FakeLLMClient()
+        content = "Intel indicates an imminent attack on the forward operating base."
+        result = await analyze_content(content, llm_client=client)
+
+        assert result["risk_level"] == "critical"
+        assert len(client.prompts) == 3  # summary, entities, explanation
+
+    @pytest.mark.asyncio
+    async def test_most_severe_keyword_wins(self):
+        """Test precedence when phrases for several levels appear."""
+        client = FakeLLMClient()
+        content = "Mostly low risk items, but one high-risk dependency slipped."
+        result = await analyze_content(content, llm_client=client)
+
+        assert result["risk_level"] == "high"
+
+    @pytest.mark.parametrize("content", [
+        "This is not a critical threat to the convoy.",
+        "No high-risk indicators were found.",
+        "Depot inspected without any high risk findings.",
+        "Backlog item marked low-priority.",
+    ])
+    def test_negated_or_priority_phrases_defer_to_llm(self, content):
+        """Test that negated phrases and priority wording settle nothing."""
+        assert _match_risk_keywords(content) is None
+
+    def test_negation_only_cancels_its_own_phrase(self):
+        """Test that a later, un-negated phrase still decides the level."""
+        content = "Not a critical threat yet, but this is a high risk route."
+
+        assert _match_risk_keywords(content) == "high"
+
+
+class TestTemplatedExplanation:
+    """Test suite for the low-risk explanation shortcut."""
+
+    @pytest.mark.asyncio
+    async def test_low_risk_explanation_skips_llm(self):
+        """Test that low-risk results with few entities are templated."""
+        client = FakeLLMClient(responses={"JSON array": "[]"})
+        content = "Quarterly supply audit completed. Low risk overall."
+        result = await analyze_content(content, llm_client=client)
+
+        assert result["risk_level"] == "low"
+        assert "Routine intake assessed as low risk." in result["explanation"]
+        assert len(client.prompts) == 2  # summary, entities
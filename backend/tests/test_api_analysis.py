@@ -0,0 +1,41 @@
+"""
+Tests for Analysis API endpoints.
+"""
+import pytest
+from httpx import AsyncClient
+
+import ai.analyzer
+
+
+async def fake_analyze(content, llm_client=None, rag_service=None):
+    return {"summary": "Convoy moves", "risk_level": "LOW", "entities": [{"name": "Convoy"}], "total_tokens": 42}
+
+
+class TestAnalysisEndpoints:
+    """Test suite for /api/analysis endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_execute_analysis(self, client: AsyncClient, sample_text_submission: dict, monkeypatch):
+        """Test that the inserted result is returned and listed in the history."""
+        monkeypatch.setattr(ai.analyzer, "analyze_content", fake_analyze)
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = created.json()["mission_id"]
+
+        response = await client.post(f"/api/analysis/{mission_id}", json={"use_rag": False})
+        history = await client.get(f"/api/analysis/{mission_id}/history")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["mission_id"], data["risk_level"], data["total_tokens"]) == (mission_id, "low", 42)
+        assert data["extracted_entities"] == [{"name": "Convoy"}]
+        assert data["analysis_id"] and data["created_at"]
+        assert history.json() == [data]
+
+    @pytest.mark.asyncio
+    async def test_execute_analysis_missing_mission(self, client: AsyncClient, monkeypatch):
+        """Test that analyzing a nonexistent mission returns 404."""
+        monkeypatch.setattr(ai.analyzer, "analyze_content", fake_analyze)
+
+        response = await client.post("/api/analysis/nonexistent-id", json={"use_rag": False})
+
+        assert response.status_code == 404
@@ -0,0 +1,159 @@
+"""
+Tests for Analytics API endpoints.
+"""
+import pytest
+from httpx import AsyncClient
+
+from models.mission import Mission
+from models.analysis import AnalysisResult
+from models.review import AnalystReview
+
+
+async def seed_missions(session, statuses):
+    """Insert one text mission per status."""
+    missions = [
+        Mission(source_type="text", source_label=f"Mission {i}", status=status)
+        for i, status in enumerate(statuses)
+    ]
+    session.add_all(missions)
+    await session.commit()
+    return missions
+
+
+class TestAnalyticsSummary:
+    """Test suite for /api/analytics/summary."""
+
+    @pytest.mark.asyncio
+    async def test_summary_empty(self, client: AsyncClient):
+        """Test the summary on an empty database."""
+        response = await client.get("/api/analytics/summary")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["total_missions"] == 0
+        assert data["total_tokens_used"] == 0
+        assert data["avg_confidence_score"] is None
+
+    @pytest.mark.asyncio
+    async def test_summary_buckets_statuses(self, client: AsyncClient, test_db):
+        """Test that grouped status counts land in the right buckets."""
+        missions = await seed_missions(
+            test_db, ["analyzed", "ANALYZED", "ingested", "pending", "analyzing", "error", "archived"]
+        )
+        test_db.add(AnalysisResult(mission_id=missions[0].mission_id, total_tokens=120, confidence_score=0.8))
+        await test_db.commit()
+
+        data = (await client.get("/api/analytics/summary")).json()
+
+        assert data["total_missions"] == 7
+        assert data["total_analyzed"] == 2
+        assert data["total_pending"] == 3
+        assert data["total_errors"] == 1
+        assert data["total_tokens_used"] == 120
+        assert data["avg_confidence_score"] == pytest.approx(0.8)
+
+    @pytest.mark.asyncio
+    async def test_summary_cached_until_mission_write(
+        self, client: AsyncClient, test_db, sample_text_submission: dict
+    ):
+        """Test that repeat polls are cached and ingestion invalidates them."""
+        assert (await client.get("/api/analytics/summary")).json()["total_missions"] == 0
+
+        # A direct insert bypasses the service layer, so the cached value stands
+        await seed_missions(test_db, ["ingested"])
+        assert (await client.get("/api/analytics/summary")).json()["total_missions"] == 0
+
+        await client.post("/api/missions/text", json=sample_text_submission)
+        assert (await client.get("/api/analytics/summary")).json()["total_missions"] == 2
+
+
+class TestAnalyticsEndpoints:
+    """Test suite for the remaining dashboard endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_review_status(self, client: AsyncClient, test_db):
+        """Test approved / pending / not-reviewed counts."""
+        missions = await seed_missions(test_db, ["analyzed"] * 4)
+        test_db.add_all([
+            AnalystReview(mission_id=missions[0].mission_id, approved=True),
+            AnalystReview(mission_id=missions[1].mission_id, approved=False),
+        ])
+        await test_db.commit()
+
+        data = (await client.get("/api/analytics/review-status")).json()
+
+        assert data == {"pending_review": 1, "approved": 1, "not_reviewed": 2, "total": 4}
+
+    @pytest.mark.asyncio
+    async def test_trends_combine_missions_and_analyses(self, client: AsyncClient, test_db):
+        """Test that daily mission counts are joined with analysis totals."""
+        missions = await seed_missions(test_db, ["analyzed", "ingested"])
+        test_db.add(AnalysisResult(mission_id=missions[0].mission_id, total_tokens=50, processing_time_ms=200))
+        await test_db.commit()
+
+        data = (await client.get("/api/analytics/trends?days=7")).json()
+
+        assert len(data["days"]) == 1
+        assert data["days"][0]["mission_count"] == 2
+        assert data["days"][0]["tokens_used"] == 50
+
+    @pytest.mark.asyncio
+    async def test_trends_keep_analysis_only_days(self, client: AsyncClient, test_db):
+        """Test that a day with analyses but no new missions is reported."""
+        from datetime import datetime, timedelta
+
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        missions = await seed_missions(test_db, ["analyzed"])
+        missions[0].ingestion_timestamp = yesterday - timedelta(days=1)
+        test_db.add(AnalysisResult(mission_id=missions[0].mission_id, total_tokens=30, created_at=yesterday))
+        await test_db.commit()
+
+        data = (await client.get("/api/analytics/trends?days=7")).json()
+
+        assert [(d["mission_count"], d["tokens_used"]) for d in data["days"]] == [(1, 0), (0, 30)]
+
+    @pytest.mark.asyncio
+    async def test_entity_breakdown_counts_types(self, client: AsyncClient, test_db):
+        """Test entity type counting across analyses, ignoring malformed items."""
+        missions = await seed_missions(test_db, ["analyzed", "analyzed"])
+        test_db.add_all([
+            AnalysisResult(mission_id=missions[0].mission_id, extracted_entities=[
+                {"name": "Phoenix", "type": "system"}, {"name": "APT", "type": "ORGANIZATION"}, "bare string"
+            ]),
+            AnalysisResult(mission_id=missions[1].mission_id, extracted_entities=[
+                {"name": "Hydra", "type": "SYSTEM"}, {"name": "no type"}
+            ]),
+        ])
+        await test_db.commit()
+
+        data = (await client.get("/api/analytics/entity-breakdown")).json()
+
+        assert data["entities"] == [
+            {"entity_type": "SYSTEM", "count": 2},
+            {"entity_type": "ORGANIZATION", "count": 1},
+        ]
+        assert data["total_entities"] == 3
+
+    @pytest.mark.asyncio
+    async def test_high_risk_missions_empty(self, client: AsyncClient):
+        """Test the high-risk list on an empty database."""
+        data = (await client.get("/api/analytics/high-risk-missions")).json()
+
+        assert data == {"missions": [], "total_high_risk": 0}
+
+    @pytest.mark.asyncio
+    async def test_high_risk_missions_projection_and_total(self, client: AsyncClient, test_db):
+        """Test newest-first listing with the total taken before the limit."""
+        missions = await seed_missions(test_db, ["analyzed"] * 3)
+        test_db.add_all([
+            AnalysisResult(mission_id=missions[0].mission_id, risk_level="high", summary_text="x" * 200),
+            AnalysisResult(mission_id=missions[1].mission_id, risk_level="critical", summary_text="Short"),
+            AnalysisResult(mission_id=missions[2].mission_id, risk_level="low"),
+        ])
+        await test_db.commit()
+
+        data = (await client.get("/api/analytics/high-risk-missions?limit=1")).json()
+
+        assert data["total_high_risk"] == 2
+        assert len(data["missions"]) == 1
+        assert data["missions"][0]["risk_level"] in ("HIGH", "CRITICAL")
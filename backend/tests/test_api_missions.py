@@ -67,6 +67,18 @@ class TestMissionEndpoints:
         get_response = await client.get(f"/api/missions/{mission_id}")
         assert get_response.status_code == 404
     
+    @pytest.mark.asyncio
+    async def test_delete_mission_removes_reviews(self, client: AsyncClient, sample_text_submission: dict):
+        """Test that deleting a mission also deletes its review."""
+        create_response = await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = create_response.json()["mission_id"]
+        await client.post(f"/api/reviews/{mission_id}", json={"analyst_notes": "Draft"})
+    
+        delete_response = await client.delete(f"/api/missions/{mission_id}")
+    
+        assert delete_response.status_code == 200
+        assert (await client.get(f"/api/reviews/{mission_id}")).status_code == 404
+    
     @pytest.mark.asyncio
     async def test_upload_csv_file(self, client: AsyncClient, sample_csv_content: bytes):
         """Test uploading a CSV file."""
@@ -78,6 +90,10 @@ class TestMissionEndpoints:
         assert data["source_type"] == "csv"
         assert data["filename"] == "test_threats.csv"
         assert data["status"] == "ingested"
+        assert data["metadata"]["row_count"] == 3
+        
+        listed = (await client.get("/api/missions")).json()["missions"][0]
+        assert listed["metadata"] == data["metadata"]
     
     @pytest.mark.asyncio
     async def test_upload_txt_file(self, client: AsyncClient, sample_txt_content: bytes):
@@ -99,6 +115,15 @@ class TestMissionEndpoints:
         assert response.status_code == 400
         assert "Unsupported file type" in response.json()["detail"]
     
+    @pytest.mark.asyncio
+    async def test_upload_extension_case_and_long_name(self, client: AsyncClient, sample_txt_content: bytes):
+        """Test that extensions match case-insensitively and overlong names are rejected."""
+        upper = {"file": ("NOTES.TXT", sample_txt_content, "text/plain")}
+        too_long = {"file": ("n" * 252 + ".txt", sample_txt_content, "text/plain")}
+        
+        assert (await client.post("/api/missions/upload", files=upper)).json()["source_type"] == "text"
+        assert (await client.post("/api/missions/upload", files=too_long)).status_code == 400
+    
     @pytest.mark.asyncio
     async def test_list_missions_with_data(self, client: AsyncClient, sample_text_submission: dict):
         """Test listing missions after creating some."""
@@ -114,3 +139,112 @@ class TestMissionEndpoints:
         data = response.json()
         assert data["total"] == 3
         assert len(data["missions"]) == 3
+    
+    @pytest.mark.asyncio
+    async def test_list_missions_includes_child_counts(
+        self, client: AsyncClient, test_db, sample_text_submission: dict
+    ):
+        """Test that each listed mission carries its analysis and review counts."""
+        from models.analysis import AnalysisResult
+        from models.review import AnalystReview
+        
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = created.json()["mission_id"]
+        test_db.add_all([
+            AnalysisResult(mission_id=mission_id, risk_level="low"),
+            AnalysisResult(mission_id=mission_id, risk_level="high"),
+            AnalystReview(mission_id=mission_id, approved=True),
+        ])
+        await test_db.commit()
+        
+        response = await client.get("/api/missions")
+        counts = {
+            m["mission_id"]: (m["analysis_count"], m["review_count"])
+            for m in response.json()["missions"]
+        }
+        
+        assert counts.pop(mission_id) == (2, 1)
+        assert list(counts.values()) == [(0, 0)]
+    
+    @pytest.mark.asyncio
+    async def test_list_missions_total_ignores_pagination(
+        self, client: AsyncClient, sample_text_submission: dict
+    ):
+        """Test that total counts all missions, not just the returned page."""
+        for _ in range(3):
+            await client.post("/api/missions/text", json=sample_text_submission)
+        
+        page = (await client.get("/api/missions?limit=2")).json()
+        past_end = (await client.get("/api/missions?limit=2&offset=5")).json()
+        
+        assert len(page["missions"]) == 2
+        assert page["total"] == 3
+        assert (past_end["missions"], past_end["total"]) == ([], 3)
+    
+    @pytest.mark.asyncio
+    async def test_list_missions_keyset_cursor(
+        self, client: AsyncClient, test_db, sample_text_submission: dict
+    ):
+        """Test that following next_cursor walks every mission once, ties included."""
+        from datetime import datetime
+        from models.mission import Mission
+        
+        stamp = datetime(2024, 1, 1, 12, 0, 0)
+        test_db.add_all([
+            Mission(source_type="text", source_label=f"Mission {i}", ingestion_timestamp=stamp)
+            for i in range(3)
+        ])
+        await test_db.commit()
+        await client.post("/api/missions/text", json=sample_text_submission)
+        
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"before": cursor} if cursor else {})}
+            page = (await client.get("/api/missions", params=params)).json()
+            seen += [m["mission_id"] for m in page["missions"]]
+            assert page["total"] == 4
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        
+        assert len(seen) == len(set(seen)) == 4
+        assert (await client.get("/api/missions", params={"before": "yesterday"})).status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_mission_detail_conditional_get(self, client: AsyncClient, sample_text_submission: dict):
+        """Test that a matching If-None-Match gets 304 until the mission changes."""
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        url = f"/api/missions/{created.json()['mission_id']}"
+        
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        cached = await client.get(url, headers={"If-None-Match": etag})
+        weak = await client.get(url, headers={"If-None-Match": f"W/{etag}"})
+        
+        assert first.headers["cache-control"] == "private, no-cache"
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert weak.status_code == 304
+        assert (await client.get(url, headers={"If-None-Match": '"stale"'})).status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_large_content_truncated_and_streamed(self, client: AsyncClient, monkeypatch):
+        """Test that detail returns a preview and /content streams the full text."""
+        from api import missions as missions_api
+        
+        monkeypatch.setattr(missions_api.settings, "mission_content_preview_chars", 100)
+        monkeypatch.setattr(missions_api, "CONTENT_CHUNK_CHARS", 64)
+        text = " ".join(f"Convoy waypoint {i} confirmed." for i in range(50))
+        created = await client.post("/api/missions/text", json={"content": text})
+        mission_id = created.json()["mission_id"]
+        
+        detail = (await client.get(f"/api/missions/{mission_id}")).json()
+        content = await client.get(f"/api/missions/{mission_id}/content")
+        
+        assert detail["content_truncated"] is True
+        assert detail["normalized_content"] == text[:100]
+        assert detail["content_length"] == len(text)
+        assert content.headers["content-type"].startswith("text/plain")
+        assert content.text == text
+        assert (await client.get("/api/missions/nonexistent-id/content")).status_code == 404
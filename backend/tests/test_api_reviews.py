@@ -0,0 +1,86 @@
+"""
+Tests for Review API endpoints.
+"""
+import pytest
+from httpx import AsyncClient
+
+
+class TestReviewEndpoints:
+    """Test suite for /api/reviews endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_submit_review(self, client: AsyncClient, sample_text_submission: dict):
+        """Test creating a review for an existing mission."""
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = created.json()["mission_id"]
+        
+        response = await client.post(
+            f"/api/reviews/{mission_id}",
+            json={"analyst_notes": "Looks right", "approved": True}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["mission_id"] == mission_id
+        assert data["analyst_notes"] == "Looks right"
+        assert data["approved"] is True
+        assert data["review_id"]
+    
+    @pytest.mark.asyncio
+    async def test_resubmit_updates_existing_review(self, client: AsyncClient, sample_text_submission: dict):
+        """Test that a second submission updates the same review."""
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = created.json()["mission_id"]
+        
+        first = await client.post(f"/api/reviews/{mission_id}", json={"analyst_notes": "Draft"})
+        second = await client.post(
+            f"/api/reviews/{mission_id}",
+            json={"analyst_notes": "Final", "approved": True}
+        )
+        fetched = await client.get(f"/api/reviews/{mission_id}")
+        
+        assert second.json()["review_id"] == first.json()["review_id"]
+        assert fetched.json()["analyst_notes"] == "Final"
+        assert fetched.json()["approved"] is True
+    
+    @pytest.mark.asyncio
+    async def test_review_for_missing_mission(self, client: AsyncClient):
+        """Test that reviewing a nonexistent mission returns 404."""
+        response = await client.post("/api/reviews/nonexistent-id", json={"approved": True})
+        
+        assert response.status_code == 404
+        assert (await client.get("/api/reviews/nonexistent-id")).status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_review_etag_changes_on_update(self, client: AsyncClient, sample_text_submission: dict):
+        """Test that updating a review invalidates the client's cached copy."""
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = created.json()["mission_id"]
+        await client.post(f"/api/reviews/{mission_id}", json={"analyst_notes": "Draft"})
+        etag = (await client.get(f"/api/reviews/{mission_id}")).headers["etag"]
+        
+        unchanged = await client.get(f"/api/reviews/{mission_id}", headers={"If-None-Match": etag})
+        await client.post(f"/api/reviews/{mission_id}", json={"analyst_notes": "Final"})
+        changed = await client.get(f"/api/reviews/{mission_id}", headers={"If-None-Match": etag})
+        
+        assert unchanged.status_code == 304
+        assert changed.status_code == 200
+        assert changed.json()["analyst_notes"] == "Final"
+    
+    @pytest.mark.asyncio
+    async def test_submit_without_upsert_support(
+        self, client: AsyncClient, sample_text_submission: dict, monkeypatch
+    ):
+        """Test the select-then-write path for dialects without ON CONFLICT."""
+        from api import reviews as reviews_api
+        
+        monkeypatch.setattr(reviews_api, "UPSERT_INSERTS", {})
+        created = await client.post("/api/missions/text", json=sample_text_submission)
+        mission_id = created.json()["mission_id"]
+        
+        first = await client.post(f"/api/reviews/{mission_id}", json={"analyst_notes": "Draft"})
+        second = await client.post(f"/api/reviews/{mission_id}", json={"analyst_notes": "Final", "approved": True})
+        
+        assert second.json()["review_id"] == first.json()["review_id"]
+        assert (second.json()["analyst_notes"], second.json()["approved"]) == ("Final", True)
+        assert (await client.post("/api/reviews/nonexistent-id", json={})).status_code == 404
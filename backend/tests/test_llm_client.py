@@ -0,0 +1,319 @@
+"""
+Tests for the Hugging Face LLM client (HTTP layer is mocked).
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ai.llm_client import HuggingFaceLLMClient
+
+
+def _chat_response(text: str) -> dict:
+    return {
+        "choices": [{"message": {"content": text}}],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 4},
+    }
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """Patch httpx.AsyncClient.post and record each outgoing request."""
+    calls = []
+
+    async def fake_post(self, url, **kwargs):
+        calls.append(json.loads(kwargs["content"]))
+        return httpx.Response(200, json=_chat_response("MEDIUM risk"))
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", fake_post)
+    return calls
+
+
+class TestResponseCache:
+    """Test suite for the exact-match response cache."""
+
+    @pytest.mark.asyncio
+    async def test_identical_prompt_served_from_cache(self, mock_api):
+        """Test that a repeated prompt skips the network call."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        first = await client.generate("Classify this", max_tokens=10)
+        second = await client.generate("Classify this", max_tokens=10)
+
+        assert len(mock_api) == 1
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["text"] == first["text"]
+        assert client.get_stats()["total_tokens"] == 16
+
+    @pytest.mark.asyncio
+    async def test_different_params_miss_cache(self, mock_api):
+        """Test that generation parameters are part of the cache key."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        await client.generate("Classify this", max_tokens=10)
+        await client.generate("Classify this", max_tokens=20)
+
+        assert len(mock_api) == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self, mock_api):
+        """Test LRU eviction once the cache is full."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+        client.cache_size = 2
+
+        await client.generate("a")
+        await client.generate("b")
+        await client.generate("a")  # refresh "a"
+        await client.generate("c")  # evicts "b"
+        await client.generate("b")
+
+        assert len(mock_api) == 4
+
+
+class FakeEmbeddingModel:
+    """Bag-of-letters embedding: whitespace/ordering changes keep vectors close."""
+
+    def encode(self, texts):
+        vectors = []
+        for text in texts:
+            vec = [0.0] * 26
+            for ch in text.lower():
+                if "a" <= ch <= "z":
+                    vec[ord(ch) - ord("a")] += 1
+            vectors.append(vec)
+        return vectors
+
+
+class FakeRAGService:
+    def __init__(self):
+        self.embedding_model = FakeEmbeddingModel()
+
+    def embed_query(self, text):
+        return self.embedding_model.encode([text])[0]
+
+
+class TestSemanticCache:
+    """Test suite for the embedding-based semantic cache."""
+
+    def _client(self) -> HuggingFaceLLMClient:
+        from ai.semantic_cache import SemanticCache
+
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+        client.semantic_cache = SemanticCache(threshold=0.95, rag_service=FakeRAGService())
+        return client
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_prompt_hits(self, mock_api):
+        """Test that a cosmetically different prompt reuses the response."""
+        client = self._client()
+
+        await client.generate("Summarize: alpha  beta gamma", task="summarize")
+        second = await client.generate("Summarize: gamma beta alpha", task="summarize")
+
+        assert len(mock_api) == 1
+        assert second["cache_hit"] is True
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_is_partitioned_by_task(self, mock_api):
+        """Test that responses are never shared across prompt types."""
+        client = self._client()
+
+        await client.generate("alpha beta gamma", task="summarize")
+        await client.generate("gamma beta alpha", task="classify_risk")
+
+        assert len(mock_api) == 2
+
+    @pytest.mark.asyncio
+    async def test_dissimilar_prompt_misses(self, mock_api):
+        """Test that unrelated prompts go to the API."""
+        client = self._client()
+
+        await client.generate("alpha beta gamma", task="summarize")
+        await client.generate("xyz quux zzz", task="summarize")
+
+        assert len(mock_api) == 2
+
+
+class TestDiskCache:
+    """Test suite for the persistent cache tier."""
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_shared_across_clients(self, mock_api, tmp_path):
+        """Test that a new client (e.g. another worker) reuses disk entries."""
+        from ai.llm_client import _open_disk_cache
+
+        writer = HuggingFaceLLMClient(api_key="test", model="test-model")
+        writer._disk = _open_disk_cache(str(tmp_path))
+        await writer.generate("Summarize this")
+
+        reader = HuggingFaceLLMClient(api_key="test", model="test-model")
+        reader._disk = _open_disk_cache(str(tmp_path))
+        result = await reader.generate("Summarize this")
+
+        assert len(mock_api) == 1
+        assert result["cache_hit"] is True
+
+
+@pytest.fixture
+def sse_api(monkeypatch):
+    """Serve a streamed (SSE) chat completion through httpx.MockTransport."""
+    tokens = ["HIGH", " -", " the", " deadline", " is", " tight", "."]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        lines = [
+            'data: {"choices": [{"delta": {"content": "%s"}}]}\n\n' % token
+            for token in tokens
+        ] + ["data: [DONE]\n\n"]
+        return httpx.Response(200, content="".join(lines).encode())
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    )
+    return requests
+
+
+class TestStreaming:
+    """Test suite for streamed generation."""
+
+    @pytest.mark.asyncio
+    async def test_generate_stream_yields_deltas(self, sse_api):
+        """Test that SSE chunks are parsed into text deltas."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        deltas = [d async for d in client.generate_stream("Classify")]
+
+        assert "".join(deltas) == "HIGH - the deadline is tight."
+        assert json.loads(sse_api[0].content)["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_stop_when_truncates_generation(self, sse_api):
+        """Test that generate() stops reading once the predicate matches."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        result = await client.generate("Classify", stop_when=lambda text: "HIGH" in text)
+
+        assert result["text"] == "HIGH"
+        assert result["cache_hit"] is False
+
+
+class TestSharedHttpClient:
+    """Test suite for the pooled HTTP client."""
+
+    @pytest.mark.asyncio
+    async def test_http_client_reused_across_calls(self, mock_api):
+        """Test that every request goes through one long-lived client."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        http_client = client._get_http_client()
+        await client.generate("first")
+        await client.generate("second")
+
+        assert client._get_http_client() is http_client
+        await client.aclose()
+        assert client._http_client is None
+
+
+class TestMicroBatching:
+    """Test suite for request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_dispatched_together(self, monkeypatch):
+        """Test that calls queued within the window are sent as one batch."""
+        in_flight = []
+        peak = []
+
+        async def fake_post(self, url, **kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return httpx.Response(200, json=_chat_response(json.loads(kwargs["content"])["messages"][0]["content"]))
+
+        monkeypatch.setattr(httpx.AsyncClient, "post", fake_post)
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+        client.batch_window_ms = 20
+
+        results = await asyncio.gather(*(client.generate(f"prompt {i}") for i in range(3)))
+
+        assert [r["text"] for r in results] == ["prompt 0", "prompt 1", "prompt 2"]
+        assert max(peak) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_flushes_at_max_size(self, mock_api):
+        """Test that a full batch is sent without waiting for the timer."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+        client.batch_window_ms = 10_000
+        client.batch_max_size = 2
+
+        await asyncio.wait_for(
+            asyncio.gather(client.generate("a"), client.generate("b")),
+            timeout=1.0
+        )
+
+        assert len(mock_api) == 2
+
+
+class TestPromptPrefix:
+    """Test suite for static-prefix prompt construction."""
+
+    def test_templates_split_static_prefix(self):
+        """Test that every template's input slots are in the dynamic part."""
+        from ai.llm_client import load_prompt_parts
+
+        for name in ["summarize", "extract_entities", "classify_risk", "explain"]:
+            prefix, template = load_prompt_parts(name)
+            assert prefix and "{" not in prefix
+            assert "{" in template
+
+    @pytest.mark.asyncio
+    async def test_system_prefix_sent_first(self, mock_api):
+        """Test that the static prefix is sent as a leading system message."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        await client.generate("dynamic input", system="static instructions")
+
+        messages = mock_api[0]["messages"]
+        assert messages[0] == {"role": "system", "content": "static instructions"}
+        assert messages[1] == {"role": "user", "content": "dynamic input"}
+
+
+class TestStopSequences:
+    """Test suite for provider-side stop sequences."""
+
+    @pytest.mark.asyncio
+    async def test_stop_sequences_sent_and_keyed(self, mock_api):
+        """Test that stop sequences reach the payload and the cache key."""
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        await client.generate("Classify", max_tokens=8, stop=["\n", "."])
+        await client.generate("Classify", max_tokens=8)
+
+        assert mock_api[0]["stop"] == ["\n", "."]
+        assert "stop" not in mock_api[1]
+
+
+class TestMetrics:
+    """Test suite for LLM call metrics."""
+
+    @pytest.mark.asyncio
+    async def test_calls_counted_by_tier(self, mock_api):
+        """Test that network calls and cache hits are recorded per tier."""
+        prometheus_client = pytest.importorskip("prometheus_client")
+
+        def count(tier):
+            return prometheus_client.REGISTRY.get_sample_value("llm_calls_total", {"tier": tier}) or 0
+
+        network_before, memory_before = count("network"), count("memory_hit")
+        client = HuggingFaceLLMClient(api_key="test", model="test-model")
+
+        await client.generate("metrics prompt")
+        await client.generate("metrics prompt")
+
+        assert count("network") == network_before + 1
+        assert count("memory_hit") == memory_before + 1
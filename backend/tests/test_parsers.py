@@ -1,6 +1,8 @@
 """
 Tests for document parsers (CSV, TXT, PDF).
 """
+import io
+
 import pytest
 from ingestion.csv_parser import parse_csv
 from ingestion.text_parser import parse_text
@@ -52,6 +54,29 @@ class TestCSVParser:
         
         assert "headers" in result
         assert result["headers"] == ["threat_id", "threat_name", "category", "severity"]
+    
+    def test_blank_rows_skipped(self):
+        """Test that empty and whitespace-only rows are dropped."""
+        content = b"name,team\nAlpha,Red\n,\n  , \t\n\nBravo,Blue\n"
+        result = parse_csv(content, "blank_rows.csv")
+        
+        assert result["rows"] == [["Alpha", "Red"], ["Bravo", "Blue"]]
+    
+    def test_parse_semicolon_csv(self):
+        """Test that non-comma dialects are still detected."""
+        content = b"threat_id;severity\nT-001;High\nT-002;Low\n"
+        result = parse_csv(content, "semicolon.csv")
+        
+        assert result["headers"] == ["threat_id", "severity"]
+        assert result["rows"] == [["T-001", "High"], ["T-002", "Low"]]
+    
+    def test_parse_csv_from_file_object(self, sample_csv_content: bytes):
+        """Test that a binary file object parses like bytes and stays open."""
+        upload = io.BytesIO(sample_csv_content)
+        result = parse_csv(upload, "test.csv")
+        
+        assert result == parse_csv(sample_csv_content, "test.csv")
+        assert not upload.closed
 
 
 class TestTextParser:
@@ -132,3 +157,37 @@ class TestNormalizer:
         
         # Content should contain the original CSV text
         assert "APT Alpha" in result["content"]
+
+
+@pytest.fixture
+def parse_pool():
+    """The parse_pool module, with any worker pool a test starts shut down afterwards."""
+    from ingestion import parse_pool
+    
+    parse_pool.shutdown_parse_pool()
+    yield parse_pool
+    parse_pool.shutdown_parse_pool()
+
+
+class TestParsePool:
+    """Test suite for off-loop parser execution."""
+    
+    @pytest.mark.asyncio
+    async def test_worker_parse_matches_inline(self, parse_pool, sample_csv_content: bytes, monkeypatch):
+        """Test that bytes and file objects parse identically in a worker."""
+        monkeypatch.setattr(parse_pool.settings, "parse_workers", 1)
+        expected = parse_csv(sample_csv_content, "test.csv")
+        
+        assert await parse_pool.run_parser(parse_csv, sample_csv_content, "test.csv") == expected
+        assert await parse_pool.run_parser(parse_csv, io.BytesIO(sample_csv_content), "test.csv") == expected
+        assert parse_pool.get_parse_pool() is not None
+    
+    @pytest.mark.asyncio
+    async def test_thread_fallback(self, parse_pool, sample_csv_content: bytes, monkeypatch):
+        """Test that parse_workers=0 parses without a process pool."""
+        monkeypatch.setattr(parse_pool.settings, "parse_workers", 0)
+        
+        result = await parse_pool.run_parser(parse_csv, io.BytesIO(sample_csv_content), "test.csv")
+        
+        assert parse_pool.get_parse_pool() is None
+        assert result["row_count"] == 3
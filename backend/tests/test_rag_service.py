@@ -0,0 +1,263 @@
+"""
+Tests for the RAG service using a deterministic stand-in embedding model.
+"""
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from ai import rag_service as rag_module
+from ai.rag_service import RAGService
+
+
+class FakeEmbeddingModel:
+    """Bag-of-letters embedder with the SentenceTransformer call surface."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 26
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), 26), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for ch in text.lower():
+                if "a" <= ch <= "z":
+                    vectors[row, ord(ch) - ord("a")] += 1.0
+        if kwargs.get("normalize_embeddings"):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms > 0, norms, 1)
+        return vectors
+
+
+@pytest.fixture
+def rag():
+    """RAG service wired to the fake embedding model."""
+    service = RAGService()
+    service.embedding_model = FakeEmbeddingModel()
+    service._reset_index()
+    service._initialized = True
+    return service
+
+
+class TestRetrieval:
+    """Test suite for indexing and retrieval."""
+
+    def test_scores_are_cosine_similarity(self, rag):
+        """Test that an identical query scores ~1.0 regardless of length."""
+        rag.add_document("Convoy logistics schedule", document_id="a")
+        rag.add_document("Zebra quartz vixen jumps", document_id="b")
+
+        results = rag.retrieve("convoy logistics schedule convoy logistics schedule", top_k=1)
+
+        assert results[0]["document_id"] == "a"
+        assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+
+    def test_index_promoted_past_threshold(self, rag, monkeypatch):
+        """Test that the flat index is swapped for HNSW at the threshold."""
+        monkeypatch.setattr(rag_module.settings, "rag_index_type", "hnsw")
+        monkeypatch.setattr(rag_module.settings, "rag_ann_threshold", 3)
+
+        for i, word in enumerate(["alpha", "bravo", "charlie", "delta"]):
+            rag.add_document(f"{word} team report", document_id=str(i))
+
+        assert isinstance(rag.index, faiss.IndexHNSWFlat)
+        assert rag.index.ntotal == 4
+        assert rag.retrieve("charlie team report", top_k=1)[0]["document_id"] == "2"
+
+    def test_scalar_quantized_index(self, rag, monkeypatch):
+        """Test that the sq8 index is trained on the buffered vectors."""
+        monkeypatch.setattr(rag_module.settings, "rag_index_type", "sq8")
+        monkeypatch.setattr(rag_module.settings, "rag_ann_threshold", 3)
+
+        for i, word in enumerate(["alpha", "bravo", "charlie", "delta"]):
+            rag.add_document(word, document_id=str(i))
+
+        assert isinstance(rag.index, faiss.IndexScalarQuantizer)
+        assert rag.index.is_trained and rag.index.ntotal == 4
+        assert rag.retrieve("delta", top_k=1)[0]["document_id"] == "3"
+
+    def test_fp16_index(self, rag, monkeypatch):
+        """Test that the fp16 index type stores half-precision vectors from the start."""
+        monkeypatch.setattr(rag_module.settings, "rag_index_type", "fp16")
+        rag._reset_index()
+        rag.add_document("Convoy logistics schedule", document_id="a")
+        rag.add_document("Zebra quartz vixen jumps", document_id="b")
+
+        assert isinstance(rag.index, faiss.IndexScalarQuantizer)
+        results = rag.retrieve("convoy logistics schedule", top_k=1)
+        assert results[0]["document_id"] == "a"
+        assert results[0]["score"] == pytest.approx(1.0, abs=1e-3)
+
+    def test_clear_resets_to_flat_index(self, rag, monkeypatch):
+        """Test that clearing drops vectors and returns to exact search."""
+        monkeypatch.setattr(rag_module.settings, "rag_ann_threshold", 1)
+        rag.add_document("alpha team report")
+        rag.clear()
+
+        assert isinstance(rag.index, faiss.IndexFlatIP)
+        assert rag.retrieve("alpha") == []
+
+    def test_retrieve_batch_matches_single_queries(self, rag):
+        """Test that one batched search returns per-query results in order."""
+        rag.add_document("Convoy logistics schedule", document_id="a")
+        rag.add_document("Zebra quartz vixen jumps", document_id="b")
+
+        batches = rag.retrieve_batch(["quartz zebra", "convoy schedule"], top_k=1)
+
+        assert [r[0]["document_id"] for r in batches] == ["b", "a"]
+        assert batches[1] == rag.retrieve("convoy schedule", top_k=1)
+
+    def test_context_lookup_does_not_grow_index(self, rag):
+        """Test that fetching analysis context leaves the corpus unchanged."""
+        rag.index_mission("Convoy logistics schedule. Fuel resupply", "m1")
+        context = rag.get_context_for_analysis("Convoy schedule update")
+
+        assert "Convoy logistics schedule" in context
+        assert rag.index.ntotal == rag.chunk_count == 1
+
+    def test_context_query_embedding_reused_when_indexing(self, rag):
+        """Test that indexing after a context lookup re-embeds only later chunks."""
+        rag.index_mission("Unrelated archive entry", "m0")
+        content = ". ".join(f"Sentence {i} about convoy logistics" for i in range(40))
+        rag.get_context_for_analysis(content)
+        rag.index_mission(content, "m1")
+
+        first_chunk = rag.chunk_text(content)[0]["text"]
+        assert first_chunk in rag.embedding_model.calls[-2]
+        assert first_chunk not in rag.embedding_model.calls[-1]
+
+    def test_index_mission_is_idempotent(self, rag):
+        """Test that re-indexing the same mission adds nothing."""
+        assert rag.index_mission("Alpha team report", "m1") == 1
+        assert rag.index_mission("Alpha team report", "m1") == 0
+        assert rag.chunk_count == 1
+
+
+class TestPersistence:
+    """Test suite for on-disk index persistence."""
+
+    def test_index_round_trips_through_disk(self, rag, monkeypatch, tmp_path):
+        """Test that a new service reloads the persisted index and chunks."""
+        monkeypatch.setattr(rag_module, "FAISS_INDEX_PATH", tmp_path)
+        monkeypatch.setattr(rag_module.settings, "rag_persist_index", True)
+        monkeypatch.setattr(rag_module.settings, "rag_persist_interval", 0)
+        rag.index_mission("Convoy logistics schedule", "m1")
+
+        reloaded = RAGService()
+        reloaded.embedding_model = FakeEmbeddingModel()
+        assert reloaded._load_persisted()
+        reloaded._initialized = True
+
+        assert reloaded.index_mission("Convoy logistics schedule", "m1") == 0
+        assert reloaded.retrieve("convoy schedule", top_k=1)[0]["document_id"] == "m1"
+
+    def test_reloaded_ivf_index_accepts_adds(self, rag, monkeypatch, tmp_path):
+        """Test that a persisted IVF index keeps growing after a reload."""
+        monkeypatch.setattr(rag_module, "FAISS_INDEX_PATH", tmp_path)
+        monkeypatch.setattr(rag_module.settings, "rag_persist_index", True)
+        monkeypatch.setattr(rag_module.settings, "rag_persist_interval", 0)
+        monkeypatch.setattr(rag_module.settings, "rag_index_type", "ivf")
+        # IVF training needs at least nlist = 4 * sqrt(n) vectors
+        monkeypatch.setattr(rag_module.settings, "rag_ann_threshold", 16)
+        for i in range(16):
+            rag.add_document(f"Report {i}: " + "convoy harbor radar"[i:], document_id=f"m{i}")
+
+        reloaded = RAGService()
+        reloaded.embedding_model = FakeEmbeddingModel()
+        assert reloaded._load_persisted()
+        reloaded._initialized = True
+
+        assert isinstance(reloaded.index, faiss.IndexIVFFlat)
+        assert reloaded.add_document("Airfield resupply", document_id="m16") == 1
+        assert reloaded.index.ntotal == 17
+
+    def test_persistence_disabled_by_default(self, rag, monkeypatch, tmp_path):
+        """Test that nothing is written unless persistence is enabled."""
+        monkeypatch.setattr(rag_module, "FAISS_INDEX_PATH", tmp_path)
+        monkeypatch.setattr(rag_module.settings, "rag_persist_interval", 0)
+        rag.add_document("Convoy logistics schedule")
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestEncoding:
+    """Test suite for batched embedding."""
+
+    def test_encodes_sorted_by_length_in_input_order(self, rag):
+        """Test that texts are batched shortest-first but returned in order."""
+        texts = ["ccc ccc ccc", "a", "bb bb"]
+        embeddings = rag._encode(texts)
+
+        assert rag.embedding_model.calls[-1] == ["a", "bb bb", "ccc ccc ccc"]
+        assert np.argmax(embeddings[0]) == 2  # 'c'
+        assert np.argmax(embeddings[1]) == 0  # 'a'
+        assert np.linalg.norm(embeddings, axis=1) == pytest.approx([1.0, 1.0, 1.0])
+
+    def test_repeated_text_uses_embedding_cache(self, rag):
+        """Test that only unseen texts reach the model."""
+        first = rag._encode(["alpha report", "bravo report"])
+        second = rag._encode(["bravo report", "charlie report"])
+
+        assert rag.embedding_model.calls[-1] == ["charlie report"]
+        assert np.array_equal(second[0], first[1])
+
+
+class TestQueryCache:
+    """Test suite for the retrieval centroid cache."""
+
+    def test_paraphrased_query_skips_search(self, rag, monkeypatch):
+        """Test that a near-identical query is served from the cache."""
+        rag.add_document("alpha team report", document_id="a")
+        rag.add_document("zebra quartz vixen", document_id="b")
+        first = rag.retrieve("alpha team report", top_k=1)
+
+        def fail_search(*args, **kwargs):
+            raise AssertionError("index searched on a cache hit")
+
+        monkeypatch.setattr(rag.index, "search", fail_search)
+        second = rag.retrieve("report alpha team", top_k=1)
+
+        assert second == first
+        assert rag._query_cache.hits == 1
+
+    def test_adding_documents_invalidates(self, rag):
+        """Test that cached results are dropped when the corpus changes."""
+        rag.add_document("alpha team report", document_id="a")
+        rag.retrieve("alpha team report", top_k=1)
+        rag.add_document("alpha team report updated", document_id="b")
+
+        assert len(rag._query_cache) == 0
+
+
+class TestChunking:
+    """Test suite for sentence-based chunking."""
+
+    def test_chunks_overlap_and_respect_size(self):
+        """Test chunk sizing and the trailing-word overlap."""
+        text = ". ".join(f"Sentence number {i} has several words in it" for i in range(40))
+        chunks = RAGService().chunk_text(text, chunk_size=200, overlap=50)
+
+        assert [c["id"] for c in chunks] == list(range(len(chunks)))
+        assert all(c["char_count"] < 260 for c in chunks)
+        assert chunks[1]["text"].startswith(" ".join(chunks[0]["text"].split()[-10:]))
+
+    def test_no_overlap(self):
+        """Test that overlap=0 starts each chunk at a sentence boundary."""
+        chunks = RAGService().chunk_text("Alpha one. Bravo two. Charlie three", chunk_size=15, overlap=0)
+
+        assert [c["text"] for c in chunks] == ["Alpha one.", "Bravo two.", "Charlie three."]
+
+    def test_planned_scan_matches_loop(self, monkeypatch):
+        """Test that the boundary-scan path produces identical chunks."""
+        text = ". ".join(f"Sentence {i} " + "word " * (i % 7) for i in range(60)) + "\nTail"
+        service = RAGService()
+
+        monkeypatch.setattr(rag_module, "njit", None)
+        expected = [service.chunk_text(text, size, ov) for size, ov in [(120, 50), (80, 0), (300, 25)]]
+        monkeypatch.setattr(rag_module, "njit", lambda **kw: None)
+        planned = [service.chunk_text(text, size, ov) for size, ov in [(120, 50), (80, 0), (300, 25)]]
+
+        assert planned == expected
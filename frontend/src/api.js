@@ -30,10 +30,10 @@ export const missionsApi = {
         return response.data;
     },
 
-    // Get all missions
-    getAll: async (limit = 100, offset = 0) => {
+    // Get all missions (pass the previous page's next_cursor as `before`)
+    getAll: async (limit = 100, offset = 0, before = null) => {
         const response = await api.get('/api/missions', {
-            params: { limit, offset },
+            params: before ? { limit, before } : { limit, offset },
         });
         return response.data;
     },
@@ -44,6 +44,14 @@ export const missionsApi = {
         return response.data;
     },
 
+    // Get full mission content (detail responses carry a preview)
+    getContent: async (missionId) => {
+        const response = await api.get(`/api/missions/${missionId}/content`, {
+            responseType: 'text',
+        });
+        return response.data;
+    },
+
     // Delete mission
     delete: async (missionId) => {
         const response = await api.delete(`/api/missions/${missionId}`);
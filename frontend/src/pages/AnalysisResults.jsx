@@ -60,6 +60,17 @@ export default function AnalysisResults() {
         loadMissionData();
     }, [loadMissionData]);
 
+    // Mission with its full content (the detail endpoint returns a preview)
+    const loadFullContent = async () => {
+        if (!mission.content_truncated) {
+            return mission;
+        }
+        const content = await missionsApi.getContent(missionId);
+        const fullMission = { ...mission, normalized_content: content, content_truncated: false };
+        setMission(fullMission);
+        return fullMission;
+    };
+
     const handleRunAnalysis = async () => {
         setIsAnalyzing(true);
         setError(null);
@@ -152,7 +163,7 @@ export default function AnalysisResults() {
                     {analysis && (
                         <button
                             className="btn btn-secondary"
-                            onClick={() => exportAnalysisToMarkdown(mission, analysis, review)}
+                            onClick={async () => exportAnalysisToMarkdown(await loadFullContent(), analysis, review)}
                             title="Download analysis report as Markdown"
                         >
                             📥 Export
@@ -182,10 +193,11 @@ export default function AnalysisResults() {
                             <h3 className="card-title">📄 Mission Content</h3>
                             <button
                                 className="btn btn-sm btn-secondary"
-                                onClick={() => {
-                                    navigator.clipboard.writeText(mission.normalized_content || '');
-                                    // Simple feedback
+                                onClick={async () => {
                                     const btn = document.activeElement;
+                                    const fullMission = await loadFullContent();
+                                    navigator.clipboard.writeText(fullMission.normalized_content || '');
+                                    // Simple feedback
                                     const originalText = btn.textContent;
                                     btn.textContent = '✓ Copied!';
                                     setTimeout(() => btn.textContent = originalText, 1500);
@@ -209,6 +221,14 @@ export default function AnalysisResults() {
                         }}>
                             {mission.normalized_content || 'No content available'}
                         </div>
+                        {mission.content_truncated && (
+                            <button
+                                className="btn btn-sm btn-secondary mt-sm"
+                                onClick={loadFullContent}
+                            >
+                                Show full content ({mission.content_length.toLocaleString()} characters)
+                            </button>
+                        )}
                     </div>
 
                     {/* Run Analysis Button */}
@@ -19,29 +19,80 @@ This script can be scheduled via cron or integrated into CI/CD pipelines.
 
 import argparse
 import asyncio
+import csv
 import json
 import os
 import sys
 from datetime import datetime
+from itertools import product
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
 
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Default API endpoint
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
+# Supported extensions
+SUPPORTED_EXTENSIONS = (".pdf", ".csv", ".txt")
+
+# Every upper/lower-case spelling of SUPPORTED_EXTENSIONS, so a single C-level
+# str.endswith matches case-insensitively without lowercasing each name
+EXTENSION_SUFFIXES = tuple(
+    "".join(chars)
+    for ext in SUPPORTED_EXTENSIONS
+    for chars in product(*({c.lower(), c.upper()} for c in ext))
+)
+
+# Files uploaded/analyzed at once
+DEFAULT_CONCURRENCY = 8
+
+# Per-phase timeouts: analyses can hold a response open for a while,
+# pool waits are already bounded by the concurrency semaphore
+CLIENT_TIMEOUT = httpx.Timeout(connect=5.0, read=90.0, write=30.0, pool=None)
+
+CSV_SUMMARY_HEADER = ("filename", "mission_id", "source_type", "status", "risk_level", "tokens", "cost")
+
+# Summary CSV field extractors, built once; files without an analysis use
+# the shared NO_ANALYSIS values
+MISSION_FIELDS = itemgetter("filename", "mission_id", "source_type", "status")
+ANALYSIS_FIELDS = itemgetter("risk_level", "total_tokens", "estimated_cost")
+NO_ANALYSIS = {"risk_level": "N/A", "total_tokens": 0, "estimated_cost": 0}
+
+
+def create_client(concurrency: int) -> httpx.AsyncClient:
+    """
+    Shared API client for a batch run.
+    
+    Negotiates HTTP/2 (one multiplexed connection) when the API is served
+    over TLS and h2 is installed; plain http:// stays on HTTP/1.1.
+    """
+    limits = httpx.Limits(
+        max_connections=concurrency * 2,
+        max_keepalive_connections=concurrency,
+        keepalive_expiry=30.0
+    )
+    options = {"base_url": API_BASE_URL, "limits": limits, "timeout": CLIENT_TIMEOUT}
+    try:
+        return httpx.AsyncClient(http2=True, **options)
+    except ImportError:
+        return httpx.AsyncClient(**options)
+
 
 async def upload_file(client: httpx.AsyncClient, file_path: Path) -> Optional[dict]:
     """Upload a single file to the API."""
     try:
+        # httpx streams an open file in 64 KiB chunks (Content-Length from
+        # fstat), so memory per upload stays flat whatever the file size
         with open(file_path, "rb") as f:
-            files = {"file": (file_path.name, f)}
-            response = await client.post(
-                f"{API_BASE_URL}/api/missions/upload",
-                files=files,
-                timeout=30.0
-            )
+            files = {"file": (file_path.name, f, "application/octet-stream")}
+            response = await client.post("/api/missions/upload", files=files)
             
         if response.status_code == 200:
             return response.json()
@@ -57,10 +108,7 @@ async def upload_file(client: httpx.AsyncClient, file_path: Path) -> Optional[di
 async def run_analysis(client: httpx.AsyncClient, mission_id: str) -> Optional[dict]:
     """Run AI analysis on a mission."""
     try:
-        response = await client.post(
-            f"{API_BASE_URL}/api/analysis/{mission_id}",
-            timeout=60.0
-        )
+        response = await client.post(f"/api/analysis/{mission_id}")
         
         if response.status_code == 200:
             return response.json()
@@ -73,21 +121,89 @@ async def run_analysis(client: httpx.AsyncClient, mission_id: str) -> Optional[d
         return None
 
 
-async def process_directory(input_dir: Path, output_dir: Path, skip_analysis: bool = False):
-    """Process all supported files in a directory."""
-    
-    # Supported extensions
-    supported_extensions = {".pdf", ".csv", ".txt"}
+def write_json_report(path: Path, results: dict):
+    """Write the full batch report as indented JSON (via orjson when installed)."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(
+                results,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                default=str
+            ))
+    else:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+
+
+def summary_row(mission_data: dict) -> tuple:
+    """One summary CSV row for a processed file."""
+    return MISSION_FIELDS(mission_data) + ANALYSIS_FIELDS(mission_data["analysis"] or NO_ANALYSIS)
+
+
+async def process_file(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    label: str,
+    file_path: Path,
+    skip_analysis: bool
+) -> Optional[dict]:
+    """Upload (and optionally analyze) one file; returns its report entry or None."""
+    async with semaphore:
+        print(f"{label} Processing: {file_path.name}")
+        
+        # Upload file
+        mission = await upload_file(client, file_path)
+        if not mission:
+            return None
+        
+        mission_data = {
+            "filename": file_path.name,
+            "mission_id": mission["mission_id"],
+            "source_type": mission["source_type"],
+            "status": mission["status"],
+            "analysis": None
+        }
+        
+        # Run analysis if not skipped
+        if not skip_analysis:
+            print(f"{label} 🔄 Running AI analysis on {file_path.name}...")
+            analysis = await run_analysis(client, mission["mission_id"])
+            
+            if analysis:
+                mission_data["analysis"] = {
+                    "risk_level": analysis.get("risk_level"),
+                    "summary": analysis.get("summary_text", "")[:200],
+                    "total_tokens": analysis.get("total_tokens"),
+                    "estimated_cost": analysis.get("estimated_cost")
+                }
+                print(f"{label} ✅ Analyzed {file_path.name} - Risk: {analysis.get('risk_level', 'N/A')}")
+            else:
+                print(f"{label} ⚠️ Analysis skipped or failed for {file_path.name}")
+        else:
+            print(f"{label} ✅ Uploaded {file_path.name} (analysis skipped)")
+        
+        return mission_data
+
+
+async def process_directory(
+    input_dir: Path,
+    output_dir: Path,
+    skip_analysis: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY
+):
+    """Process all supported files in a directory, up to `concurrency` at a time."""
     
-    # Find files
-    files = [
-        f for f in input_dir.iterdir()
-        if f.is_file() and f.suffix.lower() in supported_extensions
-    ]
+    # Find files (scandir answers is_file from the directory entry; only
+    # symlinks cost an extra stat)
+    with os.scandir(input_dir) as entries:
+        files = [
+            Path(entry.path) for entry in entries
+            if entry.name.endswith(EXTENSION_SUFFIXES) and entry.is_file()
+        ]
     
     if not files:
         print(f"No supported files found in {input_dir}")
-        print(f"Supported types: {', '.join(supported_extensions)}")
+        print(f"Supported types: {', '.join(SUPPORTED_EXTENSIONS)}")
         return
     
     print(f"\n{'='*60}")
@@ -97,6 +213,7 @@ async def process_directory(input_dir: Path, output_dir: Path, skip_analysis: bo
     print(f"Output directory: {output_dir}")
     print(f"Files to process: {len(files)}")
     print(f"Skip analysis: {skip_analysis}")
+    print(f"Concurrency: {concurrency}")
     print(f"{'='*60}\n")
     
     # Create output directory
@@ -113,10 +230,10 @@ async def process_directory(input_dir: Path, output_dir: Path, skip_analysis: bo
         "missions": []
     }
     
-    async with httpx.AsyncClient() as client:
+    async with create_client(concurrency) as client:
         # Check API connectivity
         try:
-            health = await client.get(f"{API_BASE_URL}/health", timeout=5.0)
+            health = await client.get("/health", timeout=5.0)
             if health.status_code != 200:
                 print("❌ API is not responding. Make sure the backend is running.")
                 return
@@ -127,65 +244,43 @@ async def process_directory(input_dir: Path, output_dir: Path, skip_analysis: bo
         
         print("✅ Connected to API\n")
         
-        # Process each file
-        for i, file_path in enumerate(files, 1):
-            print(f"[{i}/{len(files)}] Processing: {file_path.name}")
-            
-            # Upload file
-            mission = await upload_file(client, file_path)
-            
-            if mission:
-                results["successful_uploads"] += 1
-                mission_data = {
-                    "filename": file_path.name,
-                    "mission_id": mission["mission_id"],
-                    "source_type": mission["source_type"],
-                    "status": mission["status"],
-                    "analysis": None
-                }
-                
-                # Run analysis if not skipped
-                if not skip_analysis:
-                    print(f"  🔄 Running AI analysis...")
-                    analysis = await run_analysis(client, mission["mission_id"])
-                    
-                    if analysis:
-                        results["successful_analyses"] += 1
-                        mission_data["analysis"] = {
-                            "risk_level": analysis.get("risk_level"),
-                            "summary": analysis.get("summary_text", "")[:200],
-                            "total_tokens": analysis.get("total_tokens"),
-                            "estimated_cost": analysis.get("estimated_cost")
-                        }
-                        print(f"  ✅ Analyzed - Risk: {analysis.get('risk_level', 'N/A')}")
-                    else:
-                        print(f"  ⚠️ Analysis skipped or failed")
-                else:
-                    print(f"  ✅ Uploaded (analysis skipped)")
-                
-                results["missions"].append(mission_data)
-            else:
+        # Process files concurrently; results come back in input order
+        semaphore = asyncio.Semaphore(concurrency)
+        outcomes = await asyncio.gather(
+            *(
+                process_file(client, semaphore, f"[{i}/{len(files)}]", file_path, skip_analysis)
+                for i, file_path in enumerate(files, 1)
+            ),
+            return_exceptions=True
+        )
+        
+        for file_path, outcome in zip(files, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"❌ Error processing {file_path.name}: {outcome}")
+                outcome = None
+            if outcome is None:
                 results["failed"] += 1
-            
-            print()
+                continue
+            results["successful_uploads"] += 1
+            if outcome["analysis"]:
+                results["successful_analyses"] += 1
+            results["missions"].append(outcome)
+        
+        print()
     
     # Generate reports
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     # JSON report
     json_report = output_dir / f"batch_report_{timestamp}.json"
-    with open(json_report, "w") as f:
-        json.dump(results, f, indent=2)
+    write_json_report(json_report, results)
     
     # Summary CSV
     csv_report = output_dir / f"batch_summary_{timestamp}.csv"
-    with open(csv_report, "w") as f:
-        f.write("filename,mission_id,source_type,status,risk_level,tokens,cost\n")
-        for m in results["missions"]:
-            analysis = m.get("analysis") or {}
-            f.write(f'{m["filename"]},{m["mission_id"]},{m["source_type"]},'
-                    f'{m["status"]},{analysis.get("risk_level", "N/A")},'
-                    f'{analysis.get("total_tokens", 0)},{analysis.get("estimated_cost", 0)}\n')
+    with open(csv_report, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_SUMMARY_HEADER)
+        writer.writerows(summary_row(m) for m in results["missions"])
     
     # Print summary
     print(f"\n{'='*60}")
@@ -212,6 +307,9 @@ Examples:
   # Skip AI analysis (ingestion only)
   python scripts/batch_analyze.py --input ./data --output ./reports --skip-analysis
 
+  # Analyze up to 16 files at once
+  python scripts/batch_analyze.py --input ./data --concurrency 16
+
   # Use custom API endpoint
   API_BASE_URL=http://prod:8000 python scripts/batch_analyze.py --input ./data
         """
@@ -237,8 +335,19 @@ Examples:
         help="Skip AI analysis, only ingest documents"
     )
     
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Files processed at once (default: {DEFAULT_CONCURRENCY})"
+    )
+    
     args = parser.parse_args()
     
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1")
+        sys.exit(1)
+    
     if not args.input.exists():
         print(f"Error: Input directory does not exist: {args.input}")
         sys.exit(1)
@@ -247,7 +356,7 @@ Examples:
         print(f"Error: Input path is not a directory: {args.input}")
         sys.exit(1)
     
-    asyncio.run(process_directory(args.input, args.output, args.skip_analysis))
+    asyncio.run(process_directory(args.input, args.output, args.skip_analysis, args.concurrency))
 
 
 if __name__ == "__main__":